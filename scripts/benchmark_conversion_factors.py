@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Conversion Factors API Benchmarks
+
+Generates synthetic conversion factor datasets in the parser's output schema,
+times the API's hot functions (pytest-benchmark style: calibrated rounds,
+min/median/mean/stddev) and drives an in-process ASGI load test against each
+endpoint with a weighted query mix. Results are written as JSON; given a
+baseline results file, the run fails when a benchmark regresses beyond the
+threshold.
+
+Usage:
+    python scripts/benchmark_conversion_factors.py --sizes 10000,100000
+    python scripts/benchmark_conversion_factors.py --baseline baseline.json --threshold 0.25
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+import httpx
+import numpy as np
+import pandas as pd
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+REPO_ROOT = SCRIPTS_DIR.parent
+sys.path[:0] = [str(SCRIPTS_DIR), str(REPO_ROOT)]
+
+from parse_conversion_factors import ConversionFactorParser, FACTOR_COLUMNS  # noqa: E402
+from src.api import conversion_factors as api  # noqa: E402
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+# Micro benchmark calibration
+MIN_ROUND_SECONDS = 0.005
+MAX_BENCHMARK_SECONDS = 1.0
+MIN_ROUNDS = 3
+
+# Load test defaults
+LOAD_REQUESTS = 2000
+LOAD_CONCURRENCY = 16
+
+# Relative slowdown (of micro medians and load p50s) that fails a run against a baseline
+DEFAULT_THRESHOLD = 0.25
+
+# Synthetic category hierarchy: level1 -> (scope, activity units)
+SYNTHETIC_LEVEL1 = {
+    "Fuels": ("Scope 1", ["litres", "tonnes", "kWh (Net CV)", "kWh (Gross CV)", "cubic metres"]),
+    "Bioenergy": ("Scope 1", ["litres", "tonnes", "kWh"]),
+    "Refrigerant & other": ("Scope 1", ["kg"]),
+    "Passenger vehicles": ("Scope 1", ["km", "miles"]),
+    "UK electricity": ("Scope 2", ["kWh"]),
+    "Heat and steam": ("Scope 2", ["kWh"]),
+    "Business travel- air": ("Scope 3", ["passenger.km"]),
+    "Business travel- land": ("Scope 3", ["passenger.km", "km", "miles"]),
+    "Freighting goods": ("Scope 3", ["tonne.km", "km", "miles"]),
+    "Waste disposal": ("Scope 3", ["tonnes"]),
+    "Material use": ("Scope 3", ["tonnes"]),
+    "Water supply": ("Scope 3", ["cubic metres", "million litres"]),
+}
+SYNTHETIC_EMISSION_UNITS = ["kg CO2e", "kg CO2e of CO2 per unit", "kg CO2e of CH4 per unit", "kg CO2e of N2O per unit"]
+SYNTHETIC_WORDS = [
+    "natural", "gas", "petrol", "diesel", "coal", "biomass", "average", "small", "medium", "large",
+    "car", "van", "rail", "flight", "ferry", "economy", "business", "class", "domestic", "international",
+    "short", "long", "haul", "electric", "hybrid", "plastics", "paper", "metal", "landfill", "recycled",
+    "grid", "generated", "network", "district", "heating", "cooling", "bus", "taxi", "motorbike", "hgv"
+]
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Synthetic data
+def generate_dataset(rows: int, year: int = api.DEFAULT_YEAR, seed: int = 2025) -> ConversionFactorParser:
+    """Generate a synthetic dataset by running random sheet rows through the parser."""
+    rng = np.random.default_rng(seed)
+    level1_names = list(SYNTHETIC_LEVEL1)
+    level1 = rng.choice(level1_names, rows)
+
+    def phrases(count: int, words: int) -> np.ndarray:
+        picks = rng.choice(SYNTHETIC_WORDS, (count, words))
+        return np.array([" ".join(pick).capitalize() for pick in picks], dtype=object)
+
+    # Each level draws from a pool nested under its parent, so the hierarchy has realistic fan-out
+    level2_pool, level3_pool, level4_pool = phrases(16, 2), phrases(64, 2), phrases(8, 1)
+    level2 = level2_pool[(rng.integers(0, 4, rows) + np.searchsorted(level1_names, level1) * 4) % 16]
+    level3 = level3_pool[rng.integers(0, 64, rows)]
+    level4 = np.where(rng.random(rows) < 0.5, level4_pool[rng.integers(0, 8, rows)], None)
+
+    activity_units = np.array([rng.choice(SYNTHETIC_LEVEL1[name][1]) for name in level1], dtype=object)
+
+    df = pd.DataFrame({
+        "ID": [f"SYN{n:07d}" for n in range(rows)],
+        "Scope": [SYNTHETIC_LEVEL1[name][0] for name in level1],
+        "Level1": level1,
+        "Level2": level2,
+        "Level3": level3,
+        "Level4": level4,
+        "Column_Text": np.where(rng.random(rows) < 0.3, "Average", None),
+        "UOM": activity_units,
+        "GHG_Unit": rng.choice(SYNTHETIC_EMISSION_UNITS, rows, p=[0.7, 0.1, 0.1, 0.1]),
+        f"Conversion_Factor_{year}": np.round(rng.lognormal(-1.5, 2.0, rows), 6)
+    })
+
+    parser = ConversionFactorParser("<synthetic>", year=year)
+    parser._process_dataframe(df[FACTOR_COLUMNS + [parser.factor_column]])
+    return parser
+
+def write_dataset(parser: ConversionFactorParser, root: Path) -> Tuple[Path, Path]:
+    """Write JSON and snapshot copies into separate data directories."""
+    json_dir, snapshot_dir = root / "json", root / "snapshot"
+    parser.save_to_json(str(json_dir / f"conversion_factors_{parser.year}.json"))
+    parser.save_to_binary(str(snapshot_dir / f"conversion_factors_{parser.year}.bin"))
+    return json_dir, snapshot_dir
+
+# Micro benchmarks
+def benchmark(function: Callable[[], Any], max_seconds: float = MAX_BENCHMARK_SECONDS,
+              min_rounds: int = MIN_ROUNDS) -> Dict[str, float]:
+    """Time a function over calibrated rounds; statistics are seconds per call."""
+    start = time.perf_counter()
+    function()
+    single = time.perf_counter() - start
+    iterations = max(1, int(MIN_ROUND_SECONDS / single)) if single > 0 else 1000
+
+    samples = []
+    deadline = time.perf_counter() + max_seconds
+    while len(samples) < min_rounds or time.perf_counter() < deadline:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            function()
+        samples.append((time.perf_counter() - start) / iterations)
+
+    return {
+        "min": min(samples),
+        "max": max(samples),
+        "mean": statistics.fmean(samples),
+        "median": statistics.median(samples),
+        "stddev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "rounds": len(samples),
+        "iterations": iterations,
+        "ops": 1 / statistics.median(samples)
+    }
+
+def micro_benchmarks(year: int, json_dir: Path, snapshot_dir: Path, max_seconds: float) -> Dict[str, Dict[str, float]]:
+    """Benchmark the loaders, index builds and per-request functions on one dataset."""
+    data = api.read_conversion_factors(year, snapshot_dir)
+    dataset = api.FactorDataset(year, data, version=1, fingerprint=())
+    factors = dataset.factors
+    rng = random.Random(1)
+    sample_ids = rng.sample(factors.ids, min(1000, len(factors)))
+    text_search = api.SearchRequest(search_term="diesel")
+    filtered_search = api.SearchRequest(scope="Scope 3", category_level1="travel", search_term="economy")
+    rows = [api.ActivityRow(factor_id=factor_id, quantity=rng.uniform(1, 1000)) for factor_id in sample_ids]
+
+    cases: Dict[str, Callable[[], Any]] = {
+        "load_json": lambda: api.read_conversion_factors(year, json_dir),
+        "load_snapshot": lambda: api.read_conversion_factors(year, snapshot_dir),
+        "build_dataset": lambda: api.FactorDataset(year, data, version=1, fingerprint=()),
+        "search_factors_scan": lambda: api.search_factors(factors, filtered_search),
+        "search_index_text": lambda: dataset.index.search_positions(text_search),
+        "search_index_filtered": lambda: dataset.index.search_positions(filtered_search),
+        "search_response": lambda: api.build_search_response(dataset, filtered_search, 1, 50),
+        "ranked_search": lambda: dataset.ranked.search("natrual gas boiler", 20),
+        "quick_lookup": lambda: api.build_quick_lookup(
+            dataset, {"electricity": True, "fuel_type": "diesel", "transport_mode": "car"}
+        ),
+        "get_factor_by_id": lambda: [
+            dataset.encoded_factors[dataset.index.position_by_id[factor_id]] for factor_id in sample_ids
+        ],
+        "calculate_1000_rows": lambda: api.calculate_emissions(dataset.index, rows),
+        "category_tree": lambda: dataset.category_tree.to_dict(dataset.category_tree.root, 2),
+    }
+
+    results = {}
+    for name, function in cases.items():
+        results[name] = benchmark(function, max_seconds)
+        logger.info(f"  {name:<24} median {results[name]['median'] * 1000:10.3f} ms")
+    return results
+
+# Load tests
+def request_mix(ids: List[str], rng: random.Random) -> List[Tuple[float, str, Callable[[], Tuple]]]:
+    """Weighted endpoint mix as (weight, endpoint name, request factory) over a sample of factor IDs."""
+    terms = ["diesel", "petrol", "gas", "electricity", "flight", "rail", "car", "landfill", "paper", "hgv"]
+    typos = ["diesal", "natrual gas", "electricty", "flihgt", "petorl"]
+    level1 = list(SYNTHETIC_LEVEL1)
+
+    return [
+        (0.25, "GET /factors/{id}", lambda: ("GET", f"/factors/{rng.choice(ids)}", {})),
+        (0.20, "GET /factors", lambda: ("GET", "/factors", {"params": {
+            "search": rng.choice(terms), "page": rng.randint(1, 3), "per_page": rng.choice([20, 50])
+        }})),
+        (0.15, "GET /quick-lookup", lambda: ("GET", "/quick-lookup", {"params": rng.choice([
+            {"electricity": "true"}, {"fuel_type": rng.choice(["diesel", "petrol", "gas"])},
+            {"transport_mode": rng.choice(["car", "rail", "flight", "bus"])}
+        ])})),
+        (0.10, "POST /search", lambda: ("POST", "/search", {"json": {
+            "scope": rng.choice(["Scope 1", "Scope 2", "Scope 3"]),
+            "category_level1": rng.choice(level1),
+            "min_factor": rng.choice([None, 0.1, 1.0])
+        }})),
+        (0.10, "GET /search/ranked", lambda: ("GET", "/search/ranked", {"params": {
+            "q": rng.choice(terms + typos), "limit": 20
+        }})),
+        (0.08, "POST /factors/batch", lambda: ("POST", "/factors/batch", {"json": {
+            "ids": rng.sample(ids, 50)
+        }})),
+        (0.05, "POST /calculate", lambda: ("POST", "/calculate", {"json": {"rows": [
+            {"factor_id": factor_id, "quantity": rng.uniform(1, 1000)} for factor_id in rng.sample(ids, 100)
+        ]}})),
+        (0.04, "GET /categories/tree", lambda: ("GET", "/categories/tree", {"params": {
+            "path": [rng.choice(level1)], "depth": 2
+        }})),
+        (0.03, "GET /metadata", lambda: ("GET", "/metadata", {})),
+    ]
+
+def _percentile(samples: List[float], q: float) -> float:
+    return float(np.percentile(samples, q)) if samples else 0.0
+
+async def run_load_test(ids: List[str], requests: int, concurrency: int, seed: int = 7) -> Dict[str, Any]:
+    """Send a weighted request mix through the ASGI app and report latency per endpoint."""
+    rng = random.Random(seed)
+    mix = request_mix(ids, rng)
+    names = [name for _, name, _ in mix]
+    picks = rng.choices(mix, [weight for weight, _, _ in mix], k=requests)
+    plan = [(name, factory()) for _, name, factory in picks]
+
+    latencies: Dict[str, List[float]] = {name: [] for name in names}
+    errors: Dict[str, int] = {name: 0 for name in names}
+    queue: asyncio.Queue = asyncio.Queue()
+    for item in plan:
+        queue.put_nowait(item)
+
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        async def worker() -> None:
+            while not queue.empty():
+                name, (method, url, kwargs) = queue.get_nowait()
+                start = time.perf_counter()
+                response = await client.request(method, url, **kwargs)
+                latencies[name].append(time.perf_counter() - start)
+                if response.status_code >= 400:
+                    errors[name] += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    endpoints = {
+        name: {
+            "requests": len(samples),
+            "errors": errors[name],
+            "mean_ms": statistics.fmean(samples) * 1000,
+            "p50_ms": _percentile(samples, 50) * 1000,
+            "p95_ms": _percentile(samples, 95) * 1000,
+            "p99_ms": _percentile(samples, 99) * 1000
+        }
+        for name, samples in latencies.items() if samples
+    }
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "seconds": elapsed,
+        "requests_per_second": requests / elapsed,
+        "errors": sum(errors.values()),
+        "endpoints": endpoints
+    }
+
+# Baseline comparison
+def find_regressions(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Benchmarks present in both runs whose median (or p50 latency) grew by more than `threshold`."""
+    regressions = []
+    for size, current in results["sizes"].items():
+        previous = baseline.get("sizes", {}).get(size)
+        if not previous:
+            continue
+        pairs = [
+            (f"{size} micro {name}", stats["median"], previous.get("micro", {}).get(name, {}).get("median"))
+            for name, stats in current.get("micro", {}).items()
+        ] + [
+            (f"{size} load {name}", stats["p50_ms"],
+             previous.get("load", {}).get("endpoints", {}).get(name, {}).get("p50_ms"))
+            for name, stats in current.get("load", {}).get("endpoints", {}).items()
+        ]
+        for label, value, reference in pairs:
+            if reference and value > reference * (1 + threshold):
+                regressions.append(f"{label}: {reference:.6g} -> {value:.6g} (+{(value / reference - 1) * 100:.0f}%)")
+    return regressions
+
+def main():
+    """Main execution function."""
+
+    arg_parser = argparse.ArgumentParser(description="Benchmark the conversion factors API")
+    arg_parser.add_argument(
+        "--sizes",
+        default=",".join(str(size) for size in DEFAULT_SIZES),
+        help="Comma-separated synthetic dataset sizes (default 10000,100000,1000000)"
+    )
+    arg_parser.add_argument("--output", default="benchmark_results.json", help="Results file (default benchmark_results.json)")
+    arg_parser.add_argument("--baseline", help="Previous results file to compare against")
+    arg_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"Allowed relative slowdown against the baseline (default {DEFAULT_THRESHOLD})"
+    )
+    arg_parser.add_argument("--requests", type=int, default=LOAD_REQUESTS, help="Load test requests per size")
+    arg_parser.add_argument("--concurrency", type=int, default=LOAD_CONCURRENCY, help="Concurrent load test clients")
+    arg_parser.add_argument(
+        "--max-time",
+        type=float,
+        default=MAX_BENCHMARK_SECONDS,
+        help="Seconds spent on each micro benchmark after calibration"
+    )
+    arg_parser.add_argument("--skip-load", action="store_true", help="Only run the micro benchmarks")
+    args = arg_parser.parse_args()
+
+    api.logger.setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    results: Dict[str, Any] = {
+        "created_at": datetime.now().isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "orjson": api.orjson is not None
+        },
+        "sizes": {}
+    }
+
+    # The API resolves its data and config paths from the repository root
+    os.chdir(REPO_ROOT)
+    for size in sizes:
+        logger.info(f"Generating {size:,} synthetic factors")
+        with tempfile.TemporaryDirectory(prefix="cf-bench-") as tmp:
+            parser = generate_dataset(size)
+            json_dir, snapshot_dir = write_dataset(parser, Path(tmp))
+            ids = [factor["id"] for factor in random.Random(size).sample(parser.conversion_factors, min(500, size))]
+            del parser
+
+            logger.info(f"Micro benchmarks ({size:,} factors)")
+            size_results: Dict[str, Any] = {
+                "micro": micro_benchmarks(api.DEFAULT_YEAR, json_dir, snapshot_dir, args.max_time)
+            }
+
+            if not args.skip_load:
+                logger.info(f"Load test ({size:,} factors, {args.requests} requests, {args.concurrency} clients)")
+                api.factor_store = api.FactorStore(snapshot_dir)
+                api.response_cache.clear()
+                # Load, index and pre-serialize as app startup does, so build time stays out of the latencies
+                api.warm_up()
+                size_results["load"] = asyncio.run(
+                    run_load_test(ids, args.requests, args.concurrency)
+                )
+                logger.info(f"  {size_results['load']['requests_per_second']:,.0f} requests/s")
+
+            results["sizes"][str(size)] = size_results
+            api.factor_store = api.FactorStore()
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    logger.info(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = find_regressions(results, baseline, args.threshold)
+        if regressions:
+            logger.error(f"{len(regressions)} benchmarks regressed by more than {args.threshold:.0%}:")
+            for regression in regressions:
+                logger.error(f"  {regression}")
+            return 1
+        logger.info(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
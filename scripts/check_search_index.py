@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Search Index Equivalence Check
+
+Runs random search requests against a year's conversion factors two ways:
+through the load-time posting lists (`FactorIndex.search_positions`) and
+through the reference row scan (`search_factors` without an index). Queries
+are built from the dataset's own values, as substrings in mixed case, with
+unit and factor range filters, plus terms that match nothing. Every request
+where the two disagree on the matching factors or their order is logged, and
+the run exits non-zero if there were any.
+
+Usage:
+    python scripts/check_search_index.py
+    python scripts/check_search_index.py --data-dir /path/to/data --year 2024 --queries 5000
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+REPO_ROOT = SCRIPTS_DIR.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from src.api import conversion_factors as api  # noqa: E402
+
+DEFAULT_QUERIES = 2000
+
+# Unit filters tried besides the activity units present in the data
+EXTRA_UNITS = ["kWh", "MWh", "litres", "gallons", "tonnes", "kg", "km", "miles", "passenger.km", "not-a-unit"]
+# Terms that should match nothing
+MISSING_TERMS = ["zzqx", "Scope 9", "no such category"]
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def random_term(rng: random.Random, value: Optional[str]) -> Optional[str]:
+    """A substring of `value` in random case, sometimes the whole value or a missing term."""
+    if not value or rng.random() < 0.05:
+        return rng.choice(MISSING_TERMS)
+    if rng.random() < 0.3:
+        term = value
+    else:
+        start = rng.randrange(len(value))
+        term = value[start:start + rng.randint(1, 8)]
+    return "".join(c.upper() if rng.random() < 0.3 else c.lower() for c in term)
+
+def random_request(rng: random.Random, table: api.FactorTable, units: List[str]) -> api.SearchRequest:
+    """A search request with one to three filters drawn from a random factor."""
+    factor = table[rng.randrange(len(table))]
+    category = factor.category
+    filters: Dict[str, Any] = {
+        "scope": lambda: random_term(rng, factor.scope),
+        "category_level1": lambda: random_term(rng, category.get("level1")),
+        "category_level2": lambda: random_term(rng, category.get("level2")),
+        "category_level3": lambda: random_term(rng, category.get("level3")),
+        "activity_unit": lambda: random_term(rng, factor.units.get("activity_unit")),
+        "emission_unit": lambda: random_term(rng, factor.units.get("emission_unit")),
+        "search_term": lambda: random_term(rng, rng.choice(factor.tags or [""])),
+        "unit": lambda: rng.choice(units),
+        "range": None
+    }
+    params: Dict[str, Any] = {}
+    for name in rng.sample(list(filters), rng.randint(1, 3)):
+        if name == "range":
+            low, high = sorted(rng.sample(list(table.values[np.isfinite(table.values)]), 2))
+            if rng.random() < 0.7:
+                params["min_factor"] = low
+            if rng.random() < 0.7 or "min_factor" not in params:
+                params["max_factor"] = high
+        else:
+            params[name] = filters[name]()
+    return api.SearchRequest(**params)
+
+def check(table: api.FactorTable, index: api.FactorIndex, queries: int, seed: int) -> int:
+    """Compare the index with the scan over random requests; return the number of mismatches."""
+    rng = random.Random(seed)
+    units = sorted({u for u in table.column_strings("units.activity_unit") if u}) + EXTRA_UNITS
+    mismatches = 0
+    matched = 0
+    for n in range(queries):
+        request = random_request(rng, table, units)
+        indexed = index.search_positions(request).tolist()
+        scanned = [factor.position for factor in api.search_factors(table, request)]
+        if indexed != scanned:
+            mismatches += 1
+            missing = sorted(set(scanned) - set(indexed))
+            extra = sorted(set(indexed) - set(scanned))
+            logger.error(f"Query {n} {request.model_dump(exclude_none=True)}: index returned {len(indexed)}, "
+                         f"scan {len(scanned)} (missing {missing[:5]}, extra {extra[:5]})")
+        elif indexed:
+            matched += 1
+    logger.info(f"{queries - mismatches}/{queries} requests agree ({matched} with matches)")
+    return mismatches
+
+def main():
+    """Main execution function."""
+
+    arg_parser = argparse.ArgumentParser(description="Check the search index against the reference scan")
+    arg_parser.add_argument("--data-dir", type=Path, default=None,
+                            help=f"Directory with the parser outputs (default: {api.DATA_DIR})")
+    arg_parser.add_argument("--year", type=int, default=api.DEFAULT_YEAR, help="Conversion factor year")
+    arg_parser.add_argument("--queries", type=int, default=DEFAULT_QUERIES, help="Number of random requests")
+    arg_parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = arg_parser.parse_args()
+
+    # The API resolves its data and config paths from the repository root
+    data_dir = args.data_dir.resolve() if args.data_dir else None
+    os.chdir(REPO_ROOT)
+    store = api.FactorStore(data_dir) if data_dir else api.FactorStore()
+    if not store.has_year(args.year):
+        logger.error(f"No conversion factors for {args.year}; available years: {store.available_years()}")
+        return 1
+
+    dataset = store.get(args.year)
+    logger.info(f"Checking {args.queries} requests against {len(dataset.factors):,} factors ({args.year})")
+    return 1 if check(dataset.factors, dataset.index, args.queries, args.seed) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
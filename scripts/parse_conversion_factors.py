@@ -2,58 +2,152 @@
 """
 UK Government Conversion Factors Parser
 
-Parses the 2025 UK Government GHG Conversion Factors from the flat-file format
-and structures them into a JSON format suitable for the carbon recycling platform.
+Parses the UK Government GHG Conversion Factors (2025 by default, see --year) from
+the flat-file format and structures them into a JSON format suitable for the carbon
+recycling platform.
 
 Data Source: UK Government GHG Conversion Factors 2025 (flat-file.xlsx)
 Source URL: https://www.gov.uk/government/publications/greenhouse-gas-reporting-conversion-factors-2025
+
+Output formats:
+    json    Pretty-printed JSON export ({"metadata": ..., "conversion_factors": [...]})
+    binary  Columnar snapshot memory-mapped by the API:
+
+        magic           8 bytes, SNAPSHOT_MAGIC
+        header length   uint32, little-endian
+        header          UTF-8 JSON: format_version, byteorder, rows, metadata and
+                        a column directory of {name: {offset, length, type}}
+        columns         8-byte aligned packed arrays (array module type codes)
+
+    String fields are stored as int32 codes into a string table ("strings.offsets"
+    + "strings.data"), with -1 meaning null. Tags are stored CSR-style as
+    "tags.offsets" (rows + 1 entries) and "tags.codes".
+
+Incremental runs (--incremental) compare each factor's content hash with the
+previous JSON export. Outputs are only rewritten when something changed, along
+with a compact delta (conversion_factors_<year>.delta.json) of the added,
+removed and changed factors between the two content-addressed dataset versions.
 """
 
+import numpy as np
 import pandas as pd
+import argparse
+import hashlib
 import json
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from array import array
 from pathlib import Path
 from datetime import datetime
 import logging
-from typing import Dict, Any, List
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Iterator, IO
+
+SNAPSHOT_MAGIC = b"CFSNAP\x00\x01"
+SNAPSHOT_FORMAT_VERSION = 1
+
+FLAT_FILE_SHEET = 'Factors by Category'
+FACTOR_COLUMNS = ['ID', 'Scope', 'Level1', 'Level2', 'Level3', 'Level4', 'Column_Text', 'UOM', 'GHG_Unit']
+
+# Sheets in the condensed and full sets that hold no conversion factors
+NON_FACTOR_SHEETS = {"Introduction", "What's new", "Index", "Conversions", "Fuel properties", "Haul definition"}
+
+# When batch ingestion sees the same factor in several workbooks, the first of these wins
+WORKBOOK_PRIORITY = ['flat-file', 'full-set', 'condensed-set']
+
+# Bump when the sheet readers change so cached workbook parses are discarded
+INGEST_CACHE_VERSION = 1
+
+# Snapshot string columns, as (column name, path into the factor record)
+SNAPSHOT_STRING_COLUMNS = [
+    ("id", ("id",)),
+    ("scope", ("scope",)),
+    ("category.level1", ("category", "level1")),
+    ("category.level2", ("category", "level2")),
+    ("category.level3", ("category", "level3")),
+    ("category.level4", ("category", "level4")),
+    ("units.activity_unit", ("units", "activity_unit")),
+    ("units.emission_unit", ("units", "emission_unit")),
+    ("column_text", ("column_text",)),
+]
+
+# Written only when factors carry provenance (batch ingestion and flat-file parses)
+SNAPSHOT_PROVENANCE_COLUMNS = [
+    ("provenance.file", ("provenance", "file")),
+    ("provenance.sheet", ("provenance", "sheet")),
+]
+
+# Record fields that say where a factor was read from rather than what it is; not hashed
+DIGEST_EXCLUDED_FIELDS = {"provenance"}
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@contextmanager
+def atomic_output(output_path: Path, mode: str = 'w') -> Iterator[IO]:
+    """Write a file under a temporary name in the same directory, then rename it into place.
+    
+    Readers, including API workers that memory-map the snapshot, see either the
+    previous file or the complete new one, never a partial write.
+    """
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_name = tempfile.mkstemp(dir=output_path.parent, prefix=f".{output_path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode, encoding=None if 'b' in mode else 'utf-8') as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(temp_name, 0o644)
+        os.replace(temp_name, output_path)
+    except BaseException:
+        Path(temp_name).unlink(missing_ok=True)
+        raise
+
 class ConversionFactorParser:
-    def __init__(self, excel_file_path: str):
+    def __init__(self, excel_file_path: str, year: int = 2025):
         self.excel_file_path = Path(excel_file_path)
+        self.year = year
+        self.factor_column = f"Conversion_Factor_{year}"
         self.conversion_factors = []
+        # Content hash of each factor record, in conversion_factors order
+        self.record_digests: List[str] = []
         self.metadata = {
-            "source": "UK Government GHG Conversion Factors 2025",
-            "source_url": "https://www.gov.uk/government/publications/greenhouse-gas-reporting-conversion-factors-2025",
-            "year": 2025,
+            "source": f"UK Government GHG Conversion Factors {year}",
+            "source_url": f"https://www.gov.uk/government/publications/greenhouse-gas-reporting-conversion-factors-{year}",
+            "year": year,
             "parsed_at": datetime.now().isoformat(),
             "total_factors": 0,
             "categories": {},
             "scopes": {}
         }
+        # Seconds and rows processed per pipeline stage, for --benchmark
+        self.stage_timings: Dict[str, Dict[str, float]] = {}
+    
+    @contextmanager
+    def _stage(self, name: str, rows: int) -> Iterator[None]:
+        """Time a pipeline stage."""
+        start = time.perf_counter()
+        yield
+        self.stage_timings[name] = {"seconds": time.perf_counter() - start, "rows": rows}
     
     def parse_excel(self) -> None:
         """Parse the Excel file and extract conversion factors."""
         logger.info(f"Parsing conversion factors from {self.excel_file_path}")
         
         try:
-            # Read the main data sheet, skipping header rows
-            df = pd.read_excel(
-                self.excel_file_path, 
-                sheet_name='Factors by Category', 
-                skiprows=4
-            )
+            # Read the main data sheet
+            start = time.perf_counter()
+            df = read_flat_file_sheet(str(self.excel_file_path))
+            self.stage_timings["read_excel"] = {"seconds": time.perf_counter() - start, "rows": len(df)}
             
-            # Set proper column names
-            df.columns = [
-                'ID', 'Scope', 'Level1', 'Level2', 'Level3', 'Level4', 
-                'Column_Text', 'UOM', 'GHG_Unit', 'Conversion_Factor_2025'
-            ]
+            df = df.rename(columns={'Conversion_Factor': self.factor_column})
             
             # Clean the data
-            df = df.dropna(subset=['ID', 'Conversion_Factor_2025'])
+            df = df.dropna(subset=['ID', self.factor_column])
             
             logger.info(f"Found {len(df)} conversion factors")
             
@@ -65,75 +159,114 @@ class ConversionFactorParser:
             raise
     
     def _process_dataframe(self, df: pd.DataFrame) -> None:
-        """Process the DataFrame and convert to structured format."""
+        """Process the DataFrame and convert to structured format.
         
-        for _, row in df.iterrows():
-            try:
-                factor = self._create_factor_record(row)
-                if factor:
-                    self.conversion_factors.append(factor)
-            except Exception as e:
-                logger.warning(f"Error processing row {row.name}: {e}")
-                continue
+        All cleaning works column-wise; the only per-row Python work is emitting
+        the finished records.
+        """
+        rows = len(df)
+        df = df.reset_index(drop=True)
         
-        # Update metadata
-        self.metadata["total_factors"] = len(self.conversion_factors)
-        self._calculate_metadata()
-    
-    def _create_factor_record(self, row: pd.Series) -> Dict[str, Any]:
-        """Create a structured factor record from a DataFrame row."""
-        
-        # Skip invalid rows
-        if pd.isna(row['ID']) or pd.isna(row['Conversion_Factor_2025']):
-            return None
-        
-        # Clean and structure the data
-        factor = {
-            "id": str(row['ID']).strip(),
-            "scope": str(row['Scope']).strip() if pd.notna(row['Scope']) else None,
-            "category": {
-                "level1": str(row['Level1']).strip() if pd.notna(row['Level1']) else None,
-                "level2": str(row['Level2']).strip() if pd.notna(row['Level2']) else None,
-                "level3": str(row['Level3']).strip() if pd.notna(row['Level3']) else None,
-                "level4": str(row['Level4']).strip() if pd.notna(row['Level4']) else None,
-            },
-            "units": {
-                "activity_unit": str(row['UOM']).strip() if pd.notna(row['UOM']) else None,
-                "emission_unit": str(row['GHG_Unit']).strip() if pd.notna(row['GHG_Unit']) else None,
-            },
-            "conversion_factor": float(row['Conversion_Factor_2025']),
-            "column_text": str(row['Column_Text']).strip() if pd.notna(row['Column_Text']) else None,
-            "year": 2025
-        }
+        with self._stage("normalize", rows):
+            columns = {name: self._clean_strings(df[name]) for name in FACTOR_COLUMNS}
+            values = pd.to_numeric(df[self.factor_column], errors='coerce')
+            
+            provenance = None
+            if 'Source_File' in df.columns:
+                provenance = pd.DataFrame({
+                    "file": self._clean_strings(df['Source_File']),
+                    "sheet": self._clean_strings(df['Source_Sheet']),
+                    "row": df['Source_Row'].astype(int)
+                })
+            
+            # Skip invalid rows
+            valid = values.notna() & columns['ID'].notna()
+            if not valid.all():
+                logger.warning(f"Skipping {int((~valid).sum())} rows with a missing ID or non-numeric factor")
+                columns = {name: column[valid].reset_index(drop=True) for name, column in columns.items()}
+                values = values[valid].reset_index(drop=True)
+                if provenance is not None:
+                    provenance = provenance[valid].reset_index(drop=True)
+        
+        with self._stage("tags", rows):
+            tags = self._generate_tags(columns)
+        
+        with self._stage("records", rows):
+            year = self.year
+            records = [
+                {
+                    "id": factor_id,
+                    "scope": scope,
+                    "category": {"level1": level1, "level2": level2, "level3": level3, "level4": level4},
+                    "units": {"activity_unit": activity_unit, "emission_unit": emission_unit},
+                    "conversion_factor": value,
+                    "column_text": column_text,
+                    "year": year,
+                    "tags": factor_tags
+                }
+                for factor_id, scope, level1, level2, level3, level4, column_text, activity_unit,
+                    emission_unit, value, factor_tags in zip(
+                    *(columns[name].tolist() for name in FACTOR_COLUMNS),
+                    values.astype(float).tolist(),
+                    tags.tolist()
+                )
+            ]
+            
+            if provenance is not None:
+                for record, source in zip(records, provenance.to_dict('records')):
+                    record["provenance"] = source
+            
+            self.conversion_factors.extend(records)
         
-        # Add searchable tags
-        factor["tags"] = self._generate_tags(factor)
+        with self._stage("hash", rows):
+            self.record_digests = [record_digest(record) for record in self.conversion_factors]
+            self.metadata["dataset_version"] = dataset_version(
+                [record["id"] for record in self.conversion_factors], self.record_digests
+            )
         
-        return factor
+        # Update metadata
+        with self._stage("metadata", rows):
+            self.metadata["total_factors"] = len(self.conversion_factors)
+            self._calculate_metadata()
+    
+    @staticmethod
+    def _clean_strings(column: pd.Series) -> pd.Series:
+        """Strip a column as strings, keeping missing cells as None."""
+        cleaned = column.astype(str).str.strip().astype(object)
+        return cleaned.where(column.notna(), None)
     
-    def _generate_tags(self, factor: Dict[str, Any]) -> List[str]:
-        """Generate searchable tags for a conversion factor."""
-        tags = []
+    def _generate_tags(self, columns: Dict[str, pd.Series]) -> pd.Series:
+        """Generate searchable tags for each row, returned as sorted lists."""
+        token_parts = []
         
         # Add scope tags
-        if factor["scope"]:
-            tags.append(factor["scope"].lower().replace(" ", "_"))
+        scope = columns['Scope']
+        token_parts.append(scope[scope.fillna('') != ''].str.lower().str.replace(" ", "_", regex=False))
         
-        # Add category tags
-        for level in factor["category"].values():
-            if level and level.lower() != 'nan':
-                # Split on common separators and add each part
-                parts = str(level).lower().replace("(", " ").replace(")", " ").replace("-", " ").split()
-                tags.extend(parts)
+        # Add category tags, splitting on common separators
+        for name in ['Level1', 'Level2', 'Level3', 'Level4']:
+            level = columns[name].dropna()
+            level = level[(level != '') & (level.str.lower() != 'nan')]
+            token_parts.append(level.str.lower().str.replace(r"[()\-]", " ", regex=True).str.split().explode())
         
         # Add unit tags
-        if factor["units"]["activity_unit"]:
-            tags.append(factor["units"]["activity_unit"].lower())
+        unit = columns['UOM']
+        token_parts.append(unit[unit.fillna('') != ''].str.lower())
         
         # Clean and deduplicate tags
-        tags = list(set([tag.strip() for tag in tags if tag.strip() and len(tag.strip()) > 1]))
+        tokens = pd.concat(token_parts).dropna().astype(object).str.strip()
+        tokens = tokens[tokens.str.len() > 1]
+        tokens = (
+            tokens.rename("tag").rename_axis("row").reset_index()
+            .drop_duplicates()
+            .sort_values(["row", "tag"])
+        )
         
-        return tags
+        # Split the sorted tag column at row boundaries
+        rows = tokens["row"].to_numpy()
+        bounds = np.searchsorted(rows, np.arange(len(scope) + 1))
+        values = tokens["tag"].tolist()
+        return pd.Series([values[start:end] for start, end in zip(bounds[:-1], bounds[1:])])
     
     def _calculate_metadata(self) -> None:
         """Calculate metadata statistics."""
@@ -154,29 +287,175 @@ class ConversionFactorParser:
         self.metadata["scopes"] = scope_counts
         self.metadata["categories"] = dict(sorted(category_counts.items(), key=lambda x: x[1], reverse=True))
     
+    def compute_delta(self, previous: Dict[str, Any]) -> Dict[str, Any]:
+        """Compare the parsed factors with a previous JSON export by content hash.
+        
+        Factors are matched by ID. Changed factors list only the fields that
+        differ, with their old and new values; added factors are given in full.
+        """
+        old_factors: Dict[str, Dict[str, Any]] = {}
+        for factor in previous.get("conversion_factors", []):
+            old_factors.setdefault(factor["id"], factor)
+        old_digests = {factor_id: record_digest(factor) for factor_id, factor in old_factors.items()}
+        
+        added = []
+        changed = []
+        new_ids = set()
+        for factor, digest in zip(self.conversion_factors, self.record_digests):
+            new_ids.add(factor["id"])
+            old_digest = old_digests.get(factor["id"])
+            if old_digest is None:
+                added.append(factor)
+            elif old_digest != digest:
+                old = old_factors[factor["id"]]
+                fields = sorted(
+                    key for key in set(factor) | set(old)
+                    if key not in DIGEST_EXCLUDED_FIELDS and factor.get(key) != old.get(key)
+                )
+                changed.append({
+                    "id": factor["id"],
+                    "old": {key: old.get(key) for key in fields},
+                    "new": {key: factor.get(key) for key in fields}
+                })
+        removed = [factor_id for factor_id in old_factors if factor_id not in new_ids]
+        
+        return {
+            "year": self.year,
+            "base_version": dataset_version(list(old_digests), list(old_digests.values())) if old_factors else None,
+            "version": self.metadata["dataset_version"],
+            "created_at": datetime.now().isoformat(),
+            "summary": {
+                "added": len(added),
+                "removed": len(removed),
+                "changed": len(changed),
+                "unchanged": len(self.conversion_factors) - len(added) - len(changed)
+            },
+            "added": added,
+            "removed": removed,
+            "changed": changed
+        }
+    
+    def save_delta(self, delta: Dict[str, Any], output_file: str) -> None:
+        """Save a delta from compute_delta as compact JSON."""
+        output_path = Path(output_file)
+        
+        with atomic_output(output_path) as f:
+            json.dump(delta, f, ensure_ascii=False, separators=(',', ':'))
+        
+        summary = delta["summary"]
+        logger.info(f"Saved delta {delta['base_version']} -> {delta['version']} to {output_path}: "
+                    f"{summary['added']} added, {summary['removed']} removed, {summary['changed']} changed")
+    
     def save_to_json(self, output_file: str) -> None:
         """Save the parsed conversion factors to a JSON file."""
         output_path = Path(output_file)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
         
         data = {
             "metadata": self.metadata,
             "conversion_factors": self.conversion_factors
         }
         
-        with open(output_path, 'w', encoding='utf-8') as f:
+        with atomic_output(output_path) as f:
             json.dump(data, f, indent=2, ensure_ascii=False)
         
         logger.info(f"Saved {len(self.conversion_factors)} conversion factors to {output_path}")
     
+    def save_to_binary(self, output_file: str) -> None:
+        """Save the parsed conversion factors as a columnar binary snapshot."""
+        output_path = Path(output_file)
+        
+        # Intern every string through a single dictionary table
+        string_codes: Dict[str, int] = {}
+        
+        def intern(value: Optional[str]) -> int:
+            if value is None:
+                return -1
+            code = string_codes.get(value)
+            if code is None:
+                code = string_codes[value] = len(string_codes)
+            return code
+        
+        has_provenance = any("provenance" in f for f in self.conversion_factors)
+        
+        columns: Dict[str, array] = {}
+        for name, path in SNAPSHOT_STRING_COLUMNS + (SNAPSHOT_PROVENANCE_COLUMNS if has_provenance else []):
+            codes = array('i')
+            for factor in self.conversion_factors:
+                value = factor
+                for key in path:
+                    value = value.get(key) if value else None
+                codes.append(intern(value))
+            columns[name] = codes
+        
+        columns["conversion_factor"] = array('d', (f["conversion_factor"] for f in self.conversion_factors))
+        columns["year"] = array('i', (f["year"] for f in self.conversion_factors))
+        if has_provenance:
+            columns["provenance.row"] = array('i', (f.get("provenance", {}).get("row", -1) for f in self.conversion_factors))
+        
+        tag_offsets = array('I', [0])
+        tag_codes = array('i')
+        for factor in self.conversion_factors:
+            tag_codes.extend(intern(tag) for tag in factor["tags"])
+            tag_offsets.append(len(tag_codes))
+        columns["tags.offsets"] = tag_offsets
+        columns["tags.codes"] = tag_codes
+        
+        string_offsets = array('I', [0])
+        string_data = bytearray()
+        for value in string_codes:
+            string_data.extend(value.encode('utf-8'))
+            string_offsets.append(len(string_data))
+        columns["strings.offsets"] = string_offsets
+        columns["strings.data"] = array('B', string_data)
+        
+        # Lay out the columns; offsets are relative to the start of the data section
+        directory = {}
+        offset = 0
+        for name, values in columns.items():
+            length = len(values) * values.itemsize
+            directory[name] = {"offset": offset, "length": length, "type": values.typecode}
+            offset += length + (-length % 8)
+        
+        header = json.dumps({
+            "format_version": SNAPSHOT_FORMAT_VERSION,
+            "byteorder": sys.byteorder,
+            "rows": len(self.conversion_factors),
+            "metadata": self.metadata,
+            "columns": directory
+        }, ensure_ascii=False).encode('utf-8')
+        preamble_length = len(SNAPSHOT_MAGIC) + 4 + len(header)
+        header_padding = -preamble_length % 8
+        
+        # Replaced, never rewritten in place: API workers may have the current snapshot mapped
+        with atomic_output(output_path, 'wb') as f:
+            f.write(SNAPSHOT_MAGIC)
+            f.write((len(header) + header_padding).to_bytes(4, 'little'))
+            f.write(header + b" " * header_padding)
+            for values in columns.values():
+                data = values.tobytes()
+                f.write(data)
+                f.write(b"\x00" * (-len(data) % 8))
+        
+        logger.info(f"Saved {len(self.conversion_factors)} conversion factors to {output_path} "
+                    f"({len(string_codes)} distinct strings)")
+    
+    def get_benchmark_report(self) -> str:
+        """Get rows per second for each timed pipeline stage."""
+        lines = [f"{'Stage':<12} {'Rows':>8} {'Seconds':>9} {'Rows/s':>12}"]
+        for name, timing in self.stage_timings.items():
+            rate = timing["rows"] / timing["seconds"] if timing["seconds"] else float("inf")
+            lines.append(f"{name:<12} {int(timing['rows']):>8,} {timing['seconds']:>9.3f} {rate:>12,.0f}")
+        return "\n".join(lines)
+    
     def get_summary(self) -> str:
         """Get a summary of the parsed data."""
         summary = f"""
-UK Government Conversion Factors 2025 - Parsing Summary
+UK Government Conversion Factors {self.year} - Parsing Summary
 ======================================================
 
 Total Factors: {self.metadata['total_factors']:,}
 Parsed At: {self.metadata['parsed_at']}
+Dataset Version: {self.metadata.get('dataset_version')}
 
 Top Categories:
 {chr(10).join([f"  - {cat}: {count:,} factors" for cat, count in list(self.metadata['categories'].items())[:10]])}
@@ -187,23 +466,298 @@ Scopes:
         
         return summary
 
+# Content hashing
+def record_digest(factor: Dict[str, Any]) -> str:
+    """Content hash of a normalized factor record, ignoring where it was read from.
+
+    Tags are a set: exports from earlier parser versions list them unsorted.
+    """
+    content = {key: value for key, value in factor.items() if key not in DIGEST_EXCLUDED_FIELDS}
+    if "tags" in content:
+        content["tags"] = sorted(content["tags"])
+    encoded = json.dumps(content, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()[:16]
+
+def dataset_version(ids: List[str], digests: List[str]) -> str:
+    """Content-addressed version of a dataset: a hash of its (ID, record hash) pairs, in any order."""
+    digest = hashlib.sha256()
+    for factor_id, record in sorted(zip(ids, digests)):
+        digest.update(f"{factor_id}\x1f{record}\n".encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+def load_previous_output(output_file: str) -> Optional[Dict[str, Any]]:
+    """Read the previous JSON export, or None if there is none."""
+    output_path = Path(output_file)
+    if not output_path.exists():
+        return None
+    with open(output_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+# Batch ingestion
+def read_flat_file_sheet(path: str, sheet: str = FLAT_FILE_SHEET) -> pd.DataFrame:
+    """Read the flat-file factor sheet into the standard columns plus provenance."""
+    df = pd.read_excel(path, sheet_name=sheet, skiprows=4)
+    df.columns = FACTOR_COLUMNS + ['Conversion_Factor']
+    
+    # Four skipped rows and the header row precede the first data row (spreadsheet row 6)
+    df['Source_File'] = path
+    df['Source_Sheet'] = sheet
+    df['Source_Row'] = df.index + 6
+    return df
+
+def read_category_sheet(path: str, sheet: str) -> pd.DataFrame:
+    """Read a condensed or full-set category sheet into the standard columns plus provenance.
+    
+    These sheets hold one or more tables, each starting at an 'Activity' header
+    row: label columns up to 'Unit', then one value column per GHG unit,
+    optionally grouped by the row above (e.g. Diesel/Petrol or With RF/Without RF),
+    which becomes the column text. Blank label cells repeat the value above.
+    The workbooks carry no factor IDs, so each factor is given one derived from a
+    hash of its scope, category, column text and units, which stays stable across
+    years and revisions.
+    """
+    raw = pd.read_excel(path, sheet_name=sheet, header=None)
+    if raw.shape[1] < 2:
+        return pd.DataFrame(columns=FACTOR_COLUMNS + ['Conversion_Factor', 'Source_File', 'Source_Sheet', 'Source_Row'])
+    
+    first_column = raw[0].astype(str).str.strip()
+    
+    def sheet_label(name: str) -> Optional[str]:
+        values = raw.loc[first_column == name, 1].dropna()
+        return str(values.iloc[0]).strip() if len(values) else None
+    
+    scope = sheet_label('Scope:')
+    source = sheet_label('Emissions source:') or sheet
+    header_rows = list(raw.index[first_column == 'Activity'])
+    
+    frames = []
+    for n, header_row in enumerate(header_rows):
+        header = [str(v).strip() if pd.notna(v) else None for v in raw.iloc[header_row]]
+        if 'Unit' not in header:
+            continue
+        unit_column = header.index('Unit')
+        label_columns = [c for c in range(unit_column) if header[c]]
+        value_columns = [c for c in range(unit_column + 1, len(header)) if header[c] and header[c] != 'Year']
+        if not value_columns:
+            continue
+        
+        # A table runs to its first fully blank row or the next header
+        end = header_rows[n + 1] if n + 1 < len(header_rows) else len(raw)
+        block = raw.iloc[header_row + 1:end, label_columns + [unit_column] + value_columns]
+        blank = block.isna().all(axis=1).to_numpy()
+        if blank.any():
+            block = block.iloc[:int(np.argmax(blank))]
+        if block.empty:
+            continue
+        
+        labels = block[label_columns + [unit_column]].ffill()
+        levels = [labels[c] for c in label_columns[:2]]
+        if len(label_columns) > 2:
+            levels.append(labels[label_columns[2:]].astype(str).agg(' - '.join, axis=1))
+        levels += [None] * (3 - len(levels))
+        groups = raw.iloc[header_row - 1, value_columns].ffill() if header_row > 0 else {}
+        
+        for c in value_columns:
+            frames.append(pd.DataFrame({
+                'Scope': scope,
+                'Level1': source,
+                'Level2': levels[0],
+                'Level3': levels[1],
+                'Level4': levels[2],
+                'Column_Text': groups.get(c) if header_row > 0 else None,
+                'UOM': labels[unit_column],
+                'GHG_Unit': header[c],
+                'Conversion_Factor': pd.to_numeric(block[c], errors='coerce'),
+                'Source_Row': block.index + 1
+            }))
+    
+    if not frames:
+        return pd.DataFrame(columns=FACTOR_COLUMNS + ['Conversion_Factor', 'Source_File', 'Source_Sheet', 'Source_Row'])
+    
+    df = pd.concat(frames, ignore_index=True)
+    df = df[df['Conversion_Factor'].notna()].reset_index(drop=True)
+    
+    # Derive IDs from the descriptive key, numbering any repeats within the sheet
+    key = _factor_keys(df)
+    df['ID'] = 'h_' + key.map(lambda k: hashlib.sha1(k.encode('utf-8')).hexdigest()[:16])
+    repeat = df.groupby('ID').cumcount()
+    df.loc[repeat > 0, 'ID'] = df['ID'] + '_' + (repeat + 1).astype(str)
+    
+    df['Source_File'] = path
+    df['Source_Sheet'] = sheet
+    return df[FACTOR_COLUMNS + ['Conversion_Factor', 'Source_File', 'Source_Sheet', 'Source_Row']]
+
+def _factor_keys(df: pd.DataFrame) -> pd.Series:
+    """Descriptive key per row (scope, category levels, column text and units)."""
+    key_columns = [c for c in FACTOR_COLUMNS if c != 'ID']
+    cleaned = [ConversionFactorParser._clean_strings(df[c]).fillna('') for c in key_columns]
+    return pd.concat(cleaned, axis=1).agg('\x1f'.join, axis=1)
+
+def _read_sheet(path: str, sheet: str) -> pd.DataFrame:
+    """Process pool task: read one sheet of one workbook."""
+    if sheet == FLAT_FILE_SHEET:
+        return read_flat_file_sheet(path, sheet)
+    return read_category_sheet(path, sheet)
+
+def _workbook_digest(path: Path) -> str:
+    """Content hash of a workbook, salted with the reader version."""
+    digest = hashlib.sha256(f"ingest-v{INGEST_CACHE_VERSION}".encode())
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _workbook_priority(path: Path) -> int:
+    return WORKBOOK_PRIORITY.index(path.stem) if path.stem in WORKBOOK_PRIORITY else len(WORKBOOK_PRIORITY)
+
+def ingest_workbooks(workbooks: List[Path], year: int, cache_dir: Optional[Path] = None,
+                     max_workers: Optional[int] = None) -> ConversionFactorParser:
+    """Parse several workbooks in parallel, one process pool task per sheet.
+    
+    Results are merged into one dataset: a factor found in several workbooks is
+    kept from the highest priority one (see WORKBOOK_PRIORITY), and each factor
+    records the file, sheet and row it came from. Workbooks whose content hash
+    matches a cached parse in `cache_dir` are not read again.
+    """
+    workbooks = sorted(workbooks, key=lambda path: (_workbook_priority(path), path.name))
+    parser = ConversionFactorParser(str(workbooks[0].parent) if workbooks else "", year=year)
+    start = time.perf_counter()
+    
+    frames: Dict[Path, pd.DataFrame] = {}
+    pending: Dict[Path, tuple] = {}
+    for path in workbooks:
+        digest = _workbook_digest(path)
+        cached = cache_dir / f"{digest}.pkl" if cache_dir else None
+        if cached is not None and cached.exists():
+            logger.info(f"{path} unchanged since last run, using cached parse")
+            frames[path] = pd.read_pickle(cached)
+            continue
+        
+        with pd.ExcelFile(path) as workbook:
+            sheets = workbook.sheet_names
+        sheets = [FLAT_FILE_SHEET] if FLAT_FILE_SHEET in sheets else [s for s in sheets if s not in NON_FACTOR_SHEETS]
+        pending[path] = (digest, sheets)
+    
+    if pending:
+        tasks = sum(len(sheets) for _, sheets in pending.values())
+        logger.info(f"Reading {tasks} sheets from {len(pending)} workbooks")
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = {
+                (path, sheet): pool.submit(_read_sheet, str(path), sheet)
+                for path, (_, sheets) in pending.items() for sheet in sheets
+            }
+            for path, (digest, sheets) in pending.items():
+                frame = pd.concat([futures[(path, sheet)].result() for sheet in sheets], ignore_index=True)
+                frames[path] = frame
+                if cache_dir is not None:
+                    cache_dir.mkdir(parents=True, exist_ok=True)
+                    frame.to_pickle(cache_dir / f"{digest}.pkl")
+    
+    # Merge, dropping factors already provided by a higher priority workbook
+    seen: set = set()
+    merged = []
+    source_files = []
+    for path in workbooks:
+        frame = frames[path]
+        frame = frame[frame['ID'].notna() & pd.to_numeric(frame['Conversion_Factor'], errors='coerce').notna()]
+        keys = _factor_keys(frame)
+        fresh = ~keys.isin(seen)
+        seen.update(keys[fresh])
+        merged.append(frame[fresh])
+        source_files.append({"file": str(path), "factors": int(fresh.sum()), "duplicates": int((~fresh).sum())})
+    
+    df = pd.concat(merged, ignore_index=True) if merged else pd.DataFrame(
+        columns=FACTOR_COLUMNS + ['Conversion_Factor', 'Source_File', 'Source_Sheet', 'Source_Row']
+    )
+    parser.stage_timings["read_excel"] = {"seconds": time.perf_counter() - start, "rows": len(df)}
+    logger.info(f"Found {len(df)} conversion factors across {len(workbooks)} workbooks")
+    
+    parser.metadata["source_files"] = source_files
+    parser._process_dataframe(df.rename(columns={'Conversion_Factor': parser.factor_column}))
+    return parser
+
 def main():
     """Main execution function."""
     
+    arg_parser = argparse.ArgumentParser(description="Parse UK Government GHG Conversion Factors")
+    arg_parser.add_argument(
+        "--format",
+        choices=["json", "binary", "both"],
+        default="both",
+        help="Output format: JSON export, binary snapshot for the API, or both (default)"
+    )
+    arg_parser.add_argument("--benchmark", action="store_true", help="Report rows per second for each stage")
+    arg_parser.add_argument("--year", type=int, default=2025, help="Conversion factor year (default 2025)")
+    arg_parser.add_argument(
+        "--input",
+        help="Flat-file workbook, or the workbook directory with --batch "
+             "(default reference-data/uk-gov-conversion-factors/<year>/[flat-file.xlsx])"
+    )
+    arg_parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Ingest every workbook and sheet in the year's directory with a process pool"
+    )
+    arg_parser.add_argument("--workers", type=int, help="Process pool size for --batch (default CPU count)")
+    arg_parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Compare with the previous JSON export: leave outputs untouched if no factor changed, "
+             "otherwise rewrite them and write a delta file"
+    )
+    args = arg_parser.parse_args()
+    if args.incremental and args.format == "binary":
+        arg_parser.error("--incremental compares with the JSON export; use --format json or both")
+    
     # File paths
-    excel_file = "reference-data/uk-gov-conversion-factors/2025/flat-file.xlsx"
-    output_file = "src/data/conversion_factors_2025.json"
+    source_dir = Path(f"reference-data/uk-gov-conversion-factors/{args.year}")
+    output_file = f"src/data/conversion_factors_{args.year}.json"
+    snapshot_file = f"src/data/conversion_factors_{args.year}.bin"
+    delta_file = f"src/data/conversion_factors_{args.year}.delta.json"
+    cache_dir = Path("src/data/.ingest_cache")
     
     try:
         # Parse the conversion factors
-        parser = ConversionFactorParser(excel_file)
-        parser.parse_excel()
+        if args.batch:
+            workbooks = [
+                path for path in Path(args.input or source_dir).glob("*.xlsx")
+                if not path.name.startswith("~$")
+            ]
+            parser = ingest_workbooks(workbooks, args.year, cache_dir=cache_dir, max_workers=args.workers)
+        else:
+            parser = ConversionFactorParser(args.input or str(source_dir / "flat-file.xlsx"), year=args.year)
+            parser.parse_excel()
+        
+        rows = parser.metadata["total_factors"]
+        delta = None
+        changed = True
+        if args.incremental:
+            previous = load_previous_output(output_file)
+            if previous is None:
+                logger.info(f"No previous export at {output_file}, every factor is new")
+            with parser._stage("delta", rows):
+                delta = parser.compute_delta(previous or {})
+            changed = delta["version"] != delta["base_version"]
+            if not changed:
+                # Unchanged content keeps its outputs, and so its parse time and file fingerprints
+                parser.metadata["parsed_at"] = previous["metadata"].get("parsed_at", parser.metadata["parsed_at"])
+                logger.info(f"No factor changes since dataset version {delta['version']}, existing outputs left untouched")
         
-        # Save to JSON
-        parser.save_to_json(output_file)
+        # Save outputs
+        if args.format in ("json", "both") and (changed or not Path(output_file).exists()):
+            with parser._stage("save_json", rows):
+                parser.save_to_json(output_file)
+        if args.format in ("binary", "both") and (changed or not Path(snapshot_file).exists()):
+            with parser._stage("save_binary", rows):
+                parser.save_to_binary(snapshot_file)
+        if changed and delta is not None:
+            parser.save_delta(delta, delta_file)
         
         # Print summary
         print(parser.get_summary())
+        if args.benchmark:
+            print()
+            print(parser.get_benchmark_report())
         
     except Exception as e:
         logger.error(f"Failed to parse conversion factors: {e}")
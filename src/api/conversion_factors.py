@@ -9,27 +9,70 @@ Usage:
     uvicorn src.api.conversion_factors:app --reload --host 0.0.0.0 --port 8000
 """
 
-from fastapi import FastAPI, HTTPException, Query, Depends
+from fastapi import FastAPI, HTTPException, Query, Depends, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any, Union
+import numpy as np
+from typing import List, Optional, Dict, Any, Union, Set, Iterable, Iterator, Tuple, Callable
+import asyncio
+import contextvars
+import csv
+import heapq
+import hmac
+import io
 import json
+import math
+import mmap
+import os
 import re
+import statistics
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timezone
 from pathlib import Path
 from functools import lru_cache
 import logging
 
+try:
+    import orjson
+except ImportError:  # fall back to the standard library encoder
+    orjson = None
+
+try:
+    import resource
+except ImportError:  # not available on Windows; peak memory is then unreported
+    resource = None
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Application lifespan
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up (see `warm_up`) before serving, and watch the data files while running."""
+    warm_up()
+    factor_store.start_watching(DATA_WATCH_INTERVAL_SECONDS)
+    yield
+    factor_store.stop_watching()
+    query_executor.shutdown()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="UK Government GHG Conversion Factors API",
     description="API for querying UK Government GHG Conversion Factors 2025",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -51,6 +94,7 @@ class ConversionFactor(BaseModel):
     column_text: Optional[str]
     year: int
     tags: List[str]
+    provenance: Optional[Dict[str, Any]] = None
 
 class ConversionFactorResponse(BaseModel):
     metadata: Dict[str, Any]
@@ -58,6 +102,10 @@ class ConversionFactorResponse(BaseModel):
     total: int
     page: int
     per_page: int
+    facets: Dict[str, Dict[str, int]] = Field(
+        default_factory=dict,
+        description="Matching factors per scope, category_level1 and activity_unit value, most frequent first"
+    )
 
 class SearchRequest(BaseModel):
     scope: Optional[str] = Field(None, description="Emission scope (Scope 1, Scope 2, Scope 3)")
@@ -69,12 +117,392 @@ class SearchRequest(BaseModel):
     search_term: Optional[str] = Field(None, description="Free text search in tags and categories")
     min_factor: Optional[float] = Field(None, description="Minimum conversion factor value")
     max_factor: Optional[float] = Field(None, description="Maximum conversion factor value")
+    unit: Optional[str] = Field(
+        None, description="Report factors per this activity unit (e.g., MWh, miles, gallons); "
+                          "matches factors in any compatible unit, and min/max apply to the rescaled values"
+    )
+
+class FactorBatchRequest(BaseModel):
+    ids: List[str] = Field(..., max_length=10000, description="Conversion factor IDs to resolve")
+
+class FactorBatchResponse(BaseModel):
+    factors: List[ConversionFactor]
+    missing: List[str]
+    total: int
+
+class ActivityRow(BaseModel):
+    factor_id: Optional[str] = Field(None, description="Conversion factor ID")
+    category_path: Optional[List[str]] = Field(
+        None, description="Category levels from level 1, e.g. ['Fuels', 'Gaseous fuels', 'Natural gas']"
+    )
+    column_text: Optional[str] = Field(None, description="Column text, when a category path has several variants")
+    quantity: float = Field(..., allow_inf_nan=False, description="Activity quantity")
+    unit: Optional[str] = Field(
+        None, description="Activity unit; quantities in a compatible unit (e.g., MWh for a kWh factor) are converted"
+    )
+
+class CalculationRequest(BaseModel):
+    rows: List[ActivityRow] = Field(..., max_length=500000, description="Activity rows to calculate")
+    emission_unit: str = Field(
+        "kg CO2e", description="Emission unit used when resolving category paths; compatible units also match"
+    )
+
+class ImpactRequest(BaseModel):
+    factor_ids: List[str] = Field([], max_length=100000, description="IDs of the conversion factors in use")
+    rows: List[ActivityRow] = Field([], max_length=500000, description="Activity totals, resolved as by /calculate")
+    emission_unit: str = Field("kg CO2e", description="Emission unit used when resolving category paths")
+
+# Binary snapshots (written by scripts/parse_conversion_factors.py --format binary)
+SNAPSHOT_MAGIC = b"CFSNAP\x00\x01"
+
+class FactorSnapshot:
+    """Read-only view over a memory-mapped columnar factor snapshot.
+    
+    Columns are exposed as memoryviews into the mapping, so forked workers
+    share the underlying pages instead of each holding a parsed copy.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        if self._mmap[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+            raise ValueError(f"Not a conversion factor snapshot: {path}")
+        
+        header_start = len(SNAPSHOT_MAGIC) + 4
+        header_length = int.from_bytes(self._mmap[len(SNAPSHOT_MAGIC):header_start], 'little')
+        header = json.loads(self._mmap[header_start:header_start + header_length].decode('utf-8'))
+        
+        self.rows: int = header["rows"]
+        self.metadata: Dict[str, Any] = header["metadata"]
+        self._columns: Dict[str, Dict[str, Any]] = header["columns"]
+        self._data_start = header_start + header_length
+        self._swap_bytes = header["byteorder"] != sys.byteorder
+        
+        offsets = self.column("strings.offsets")
+        data = self.column("strings.data")
+        self.strings: List[str] = [
+            str(data[offsets[i]:offsets[i + 1]], 'utf-8') for i in range(len(offsets) - 1)
+        ]
+
+    def column(self, name: str) -> Union[memoryview, array]:
+        """Return a column as a typed memoryview over the mapping."""
+        entry = self._columns[name]
+        start = self._data_start + entry["offset"]
+        view = memoryview(self._mmap)[start:start + entry["length"]].cast(entry["type"])
+        
+        if self._swap_bytes and view.itemsize > 1:
+            # Snapshot written on a machine of the other endianness: decode a private copy
+            values = array(entry["type"], view.tobytes())
+            values.byteswap()
+            return values
+        return view
+
+    def has_column(self, name: str) -> bool:
+        return name in self._columns
+
+# Columnar factor store
+# String fields of a factor record, named as in the binary snapshot
+TABLE_STRING_COLUMNS = (
+    "id", "scope", "category.level1", "category.level2", "category.level3", "category.level4",
+    "units.activity_unit", "units.emission_unit", "column_text"
+)
+CATEGORY_LEVELS = ("level1", "level2", "level3", "level4")
+
+class FactorRow:
+    """Read-only view of one factor in a `FactorTable`.
+    
+    Fields are attributes, and `row["id"]` / `row.get("category", {})` work as
+    on the JSON records, so code written against the dicts keeps working.
+    """
+    __slots__ = ("table", "position")
+
+    FIELDS = ("id", "scope", "category", "units", "conversion_factor", "column_text", "year", "tags", "provenance")
+
+    def __init__(self, table: "FactorTable", position: int):
+        self.table = table
+        self.position = position
+
+    @property
+    def id(self) -> str:
+        return self.table.string("id", self.position)
+
+    @property
+    def scope(self) -> Optional[str]:
+        return self.table.string("scope", self.position)
+
+    @property
+    def category(self) -> Dict[str, Optional[str]]:
+        return {level: self.table.string(f"category.{level}", self.position) for level in CATEGORY_LEVELS}
+
+    @property
+    def units(self) -> Dict[str, Optional[str]]:
+        return {
+            "activity_unit": self.table.string("units.activity_unit", self.position),
+            "emission_unit": self.table.string("units.emission_unit", self.position)
+        }
+
+    @property
+    def conversion_factor(self) -> float:
+        return float(self.table.values[self.position])
+
+    @property
+    def column_text(self) -> Optional[str]:
+        return self.table.string("column_text", self.position)
+
+    @property
+    def year(self) -> int:
+        return int(self.table.years[self.position])
+
+    @property
+    def tags(self) -> List[str]:
+        return self.table.tags(self.position)
+
+    @property
+    def provenance(self) -> Optional[Dict[str, Any]]:
+        return self.table.provenance(self.position)
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        value = getattr(self, key)
+        if value is None and key == "provenance":
+            raise KeyError(key)
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The factor as a JSON export record."""
+        return self.table.record(self.position)
+
+class FactorTable:
+    """Columnar in-memory store of one year's conversion factors.
+    
+    Every string is interned once in `strings`; string fields are int32 code
+    arrays into it (-1 is null), conversion factors a float64 array and tags
+    CSR-style `tag_offsets`/`tag_codes`. Indexing returns `FactorRow` views.
+    """
+
+    def __init__(self, strings: List[str], codes: Dict[str, np.ndarray], values: np.ndarray, years: np.ndarray,
+                 tag_offsets: np.ndarray, tag_codes: np.ndarray, provenance: Optional[Dict[str, np.ndarray]] = None):
+        self.strings = strings
+        self.codes = codes
+        self.values = values
+        self.years = years
+        self.tag_offsets = tag_offsets
+        self.tag_codes = tag_codes
+        # "provenance.file" / "provenance.sheet" codes and "provenance.row", when the data carries provenance
+        self.provenance_columns = provenance
+        self.ids: List[str] = self.column_strings("id")
+        self._distinct: Dict[str, np.ndarray] = {}
+        self._tag_rows: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_records(cls, factors: List[Dict[str, Any]]) -> "FactorTable":
+        """Build a table from JSON export records."""
+        string_codes: Dict[str, int] = {}
+        
+        def intern(value: Optional[str]) -> int:
+            if value is None:
+                return -1
+            code = string_codes.get(value)
+            if code is None:
+                code = string_codes[value] = len(string_codes)
+            return code
+        
+        def field(factor: Dict, column: str) -> Optional[str]:
+            if "." not in column:
+                return factor.get(column)
+            group, name = column.split(".")
+            return factor.get(group, {}).get(name)
+        
+        count = len(factors)
+        codes = {
+            column: np.fromiter((intern(field(f, column)) for f in factors), dtype=np.int32, count=count)
+            for column in TABLE_STRING_COLUMNS
+        }
+        values = np.fromiter((f.get("conversion_factor", 0) for f in factors), dtype=np.float64, count=count)
+        years = np.fromiter((f.get("year", 0) for f in factors), dtype=np.int32, count=count)
+        tag_offsets = np.zeros(count + 1, dtype=np.int64)
+        tag_offsets[1:] = np.cumsum([len(f.get("tags", [])) for f in factors])
+        tag_codes = np.fromiter(
+            (intern(tag) for f in factors for tag in f.get("tags", [])), dtype=np.int32, count=int(tag_offsets[-1])
+        )
+        
+        provenance = None
+        if any("provenance" in f for f in factors):
+            provenance = {
+                "provenance.file": np.fromiter(
+                    (intern(f.get("provenance", {}).get("file")) for f in factors), dtype=np.int32, count=count
+                ),
+                "provenance.sheet": np.fromiter(
+                    (intern(f.get("provenance", {}).get("sheet")) for f in factors), dtype=np.int32, count=count
+                ),
+                "provenance.row": np.fromiter(
+                    (f.get("provenance", {}).get("row", -1) for f in factors), dtype=np.int32, count=count
+                )
+            }
+        return cls(list(string_codes), codes, values, years, tag_offsets, tag_codes, provenance)
+
+    @classmethod
+    def from_snapshot(cls, snapshot: "FactorSnapshot") -> "FactorTable":
+        """Build a table from a snapshot's columns without materialising records.
+        
+        Columns are read-only arrays over the mapping itself, so forked workers
+        share the snapshot's pages. The parser replaces the file rather than
+        rewriting it, so a table keeps reading the version it was built from.
+        """
+        def column(name: str) -> np.ndarray:
+            return np.asarray(snapshot.column(name))
+        
+        provenance = None
+        if snapshot.has_column("provenance.file"):
+            provenance = {
+                "provenance.file": column("provenance.file"),
+                "provenance.sheet": column("provenance.sheet"),
+                "provenance.row": column("provenance.row")
+            }
+        return cls(
+            snapshot.strings,
+            {name: column(name) for name in TABLE_STRING_COLUMNS},
+            column("conversion_factor"),
+            column("year"),
+            column("tags.offsets"),
+            column("tags.codes"),
+            provenance
+        )
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, position: Union[int, slice]) -> Union[FactorRow, List[FactorRow]]:
+        if isinstance(position, slice):
+            return [FactorRow(self, p) for p in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("factor position out of range")
+        return FactorRow(self, position)
+
+    def __iter__(self) -> Iterator[FactorRow]:
+        return (FactorRow(self, position) for position in range(len(self)))
+
+    def string(self, column: str, position: int) -> Optional[str]:
+        code = self.codes[column][position]
+        return self.strings[code] if code >= 0 else None
+
+    def column_strings(self, column: str) -> List[Optional[str]]:
+        """Decode a string column, one entry per row."""
+        strings = self.strings
+        return [strings[code] if code >= 0 else None for code in self.codes[column].tolist()]
+
+    def tags(self, position: int) -> List[str]:
+        strings = self.strings
+        start, end = self.tag_offsets[position], self.tag_offsets[position + 1]
+        return [strings[code] for code in self.tag_codes[start:end].tolist()]
+
+    def provenance(self, position: int) -> Optional[Dict[str, Any]]:
+        columns = self.provenance_columns
+        if columns is None or columns["provenance.file"][position] < 0:
+            return None
+        sheet = columns["provenance.sheet"][position]
+        return {
+            "file": self.strings[columns["provenance.file"][position]],
+            "sheet": self.strings[sheet] if sheet >= 0 else None,
+            "row": int(columns["provenance.row"][position])
+        }
+
+    def record(self, position: int) -> Dict[str, Any]:
+        """A row in the JSON export record shape."""
+        record = {
+            "id": self.ids[position],
+            "scope": self.string("scope", position),
+            "category": {level: self.string(f"category.{level}", position) for level in CATEGORY_LEVELS},
+            "units": {
+                "activity_unit": self.string("units.activity_unit", position),
+                "emission_unit": self.string("units.emission_unit", position)
+            },
+            "conversion_factor": float(self.values[position]),
+            "column_text": self.string("column_text", position),
+            "year": int(self.years[position]),
+            "tags": self.tags(position)
+        }
+        provenance = self.provenance(position)
+        if provenance is not None:
+            record["provenance"] = provenance
+        return record
+
+    def distinct_codes(self, column: str) -> np.ndarray:
+        """Codes occurring in a string column (or "tags"), excluding null."""
+        distinct = self._distinct.get(column)
+        if distinct is None:
+            codes = self.tag_codes if column == "tags" else self.codes[column]
+            distinct = self._distinct[column] = np.unique(codes[codes >= 0])
+        return distinct
+
+    def tag_rows(self) -> np.ndarray:
+        """Row position of every entry in `tag_codes`."""
+        if self._tag_rows is None:
+            self._tag_rows = np.repeat(np.arange(len(self), dtype=np.int64), np.diff(self.tag_offsets))
+        return self._tag_rows
+
+    def rows_where(self, column: str, predicate: Callable[[str], bool]) -> np.ndarray:
+        """Boolean row mask of rows whose value (any tag, for "tags") satisfies `predicate`.
+        
+        The predicate runs once per distinct string, never per row.
+        """
+        strings = self.strings
+        matching = [code for code in self.distinct_codes(column).tolist() if predicate(strings[code])]
+        if column != "tags":
+            return np.isin(self.codes[column], matching)
+        mask = np.zeros(len(self), dtype=bool)
+        mask[self.tag_rows()[np.isin(self.tag_codes, matching)]] = True
+        return mask
+
+    def contains(self, column: str, term: str) -> np.ndarray:
+        """Boolean row mask: the column's value contains `term`, case-insensitively."""
+        term = term.lower()
+        return self.rows_where(column, lambda value: term in value.lower())
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the arrays and the string table."""
+        arrays = [self.values, self.years, self.tag_offsets, self.tag_codes, *self.codes.values()]
+        if self.provenance_columns:
+            arrays.extend(self.provenance_columns.values())
+        return (
+            sum(a.nbytes for a in arrays) + sys.getsizeof(self.strings) + sys.getsizeof(self.ids)
+            + sum(sys.getsizeof(s) for s in self.strings)
+        )
 
 # Data loading
-@lru_cache(maxsize=1)
-def load_conversion_factors() -> Dict[str, Any]:
-    """Load conversion factors from JSON file with caching."""
-    data_file = Path("src/data/conversion_factors_2025.json")
+DATA_DIR = Path("src/data")
+DEFAULT_YEAR = 2025
+
+def read_conversion_factors(year: int, data_dir: Path = DATA_DIR) -> Dict[str, Any]:
+    """Read one year of conversion factors, preferring the binary snapshot over JSON.
+    
+    Returns {"metadata": ..., "table": FactorTable}.
+    """
+    data_file = data_dir / f"conversion_factors_{year}.json"
+    snapshot_file = data_file.with_suffix(".bin")
+    
+    # Use the snapshot unless the JSON export has been regenerated since
+    if snapshot_file.exists() and (
+        not data_file.exists() or snapshot_file.stat().st_mtime >= data_file.stat().st_mtime
+    ):
+        try:
+            snapshot = FactorSnapshot(snapshot_file)
+            data = {"metadata": snapshot.metadata, "table": FactorTable.from_snapshot(snapshot)}
+            logger.info(f"Loaded {data['metadata']['total_factors']} {year} conversion factors from snapshot")
+            return data
+        except Exception as e:
+            logger.warning(f"Error loading snapshot {snapshot_file}, falling back to JSON: {e}")
     
     if not data_file.exists():
         raise FileNotFoundError(f"Conversion factors file not found: {data_file}")
@@ -82,19 +510,23 @@ def load_conversion_factors() -> Dict[str, Any]:
     try:
         with open(data_file, 'r', encoding='utf-8') as f:
             data = json.load(f)
+        data["table"] = FactorTable.from_records(data.pop("conversion_factors"))
         
-        logger.info(f"Loaded {data['metadata']['total_factors']} conversion factors")
+        logger.info(f"Loaded {data['metadata']['total_factors']} {year} conversion factors")
         return data
     
     except Exception as e:
         logger.error(f"Error loading conversion factors: {e}")
         raise
 
-@lru_cache(maxsize=1)
-def load_major_changes() -> Dict[str, Any]:
-    """Load major changes analysis from JSON file with caching."""
-    changes_file = Path("src/data/major_changes_2025.json")
+MAJOR_CHANGES_FILE = DATA_DIR / "major_changes_2025.json"
+
+def load_major_changes(changes_file: Path = MAJOR_CHANGES_FILE) -> Dict[str, Any]:
+    """Load the major changes analysis.
     
+    Read whenever a dataset is built and kept on it, so the document and its
+    join to the factors are swapped in together on reload.
+    """
     if not changes_file.exists():
         return {"metadata": {"title": "No major changes data available"}, "major_changes": []}
     
@@ -105,258 +537,2723 @@ def load_major_changes() -> Dict[str, Any]:
         logger.error(f"Error loading major changes: {e}")
         return {"metadata": {"title": "Error loading changes"}, "major_changes": []}
 
-# Helper functions
-def search_factors(factors: List[Dict], search_params: SearchRequest) -> List[Dict]:
-    """Search and filter conversion factors based on parameters."""
-    filtered_factors = factors.copy()
-    
-    # Filter by scope
-    if search_params.scope:
-        filtered_factors = [
-            f for f in filtered_factors 
-            if f.get('scope') and search_params.scope.lower() in f['scope'].lower()
-        ]
+QUICK_LOOKUP_CONFIG = DATA_DIR / "quick_lookups.json"
+
+def load_quick_lookup_config(config_file: Path = QUICK_LOOKUP_CONFIG) -> Dict[str, Any]:
+    """Load the /quick-lookup table definitions.
     
-    # Filter by category levels
-    if search_params.category_level1:
-        filtered_factors = [
-            f for f in filtered_factors 
-            if f.get('category', {}).get('level1') and 
-               search_params.category_level1.lower() in f['category']['level1'].lower()
-        ]
+    Read whenever a dataset is built, so a config change takes effect on the
+    next reload.
+    """
+    try:
+        with open(config_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        logger.error(f"Error loading quick lookup config: {e}")
+        return {"lookups": []}
+
+# Units
+# Known units as (dimension, scale to the dimension's base unit); gallons are UK imperial
+UNIT_BASES = {
+    "energy": "kWh",
+    "distance": "km",
+    "mass": "kg",
+    "volume": "litres",
+    "freight distance": "tonne.km",
+    "passenger distance": "passenger.km"
+}
+UNIT_SCALES: Dict[str, Tuple[str, float]] = {
+    "kwh": ("energy", 1.0),
+    "wh": ("energy", 0.001),
+    "mwh": ("energy", 1000.0),
+    "gwh": ("energy", 1000000.0),
+    "mj": ("energy", 1 / 3.6),
+    "gj": ("energy", 1000 / 3.6),
+    "therm": ("energy", 29.3071),
+    "therms": ("energy", 29.3071),
+    "km": ("distance", 1.0),
+    "m": ("distance", 0.001),
+    "metres": ("distance", 0.001),
+    "mile": ("distance", 1.609344),
+    "miles": ("distance", 1.609344),
+    "kg": ("mass", 1.0),
+    "g": ("mass", 0.001),
+    "t": ("mass", 1000.0),
+    "tonne": ("mass", 1000.0),
+    "tonnes": ("mass", 1000.0),
+    "lb": ("mass", 0.45359237),
+    "lbs": ("mass", 0.45359237),
+    "l": ("volume", 1.0),
+    "litre": ("volume", 1.0),
+    "litres": ("volume", 1.0),
+    "liters": ("volume", 1.0),
+    "ml": ("volume", 0.001),
+    "m3": ("volume", 1000.0),
+    "cubic metre": ("volume", 1000.0),
+    "cubic metres": ("volume", 1000.0),
+    "million litres": ("volume", 1000000.0),
+    "gallon": ("volume", 4.54609),
+    "gallons": ("volume", 4.54609),
+    "us gallon": ("volume", 3.785411784),
+    "us gallons": ("volume", 3.785411784),
+    "tonne.km": ("freight distance", 1.0),
+    "tkm": ("freight distance", 1.0),
+    "tonne.mile": ("freight distance", 1.609344),
+    "tonne.miles": ("freight distance", 1.609344),
+    "passenger.km": ("passenger distance", 1.0),
+    "pkm": ("passenger distance", 1.0),
+    "passenger.mile": ("passenger distance", 1.609344),
+    "passenger.miles": ("passenger distance", 1.609344)
+}
+UNIT_MAX_WORDS = max(len(name.split()) for name in UNIT_SCALES)
+
+_WORD_PATTERN = re.compile(r"\S+")
+
+class Unit:
+    """A parsed unit string such as "kWh (Net CV)" or "kg CO2e of CO2 per unit".
     
-    if search_params.category_level2:
-        filtered_factors = [
-            f for f in filtered_factors 
-            if f.get('category', {}).get('level2') and 
-               search_params.category_level2.lower() in f['category']['level2'].lower()
-        ]
+    `scale` converts a quantity in this unit to the dimension's base unit.
+    Anything after the unit itself is the qualifier: a calorific basis or the
+    gas measured, which has to agree between two units for them to be
+    interchangeable. `suffix` keeps it as written, for relabelling.
+    """
+    __slots__ = ("text", "dimension", "scale", "qualifier", "suffix")
+
+    def __init__(self, text: str, dimension: str, scale: float, qualifier: str, suffix: str):
+        self.text = text
+        self.dimension = dimension
+        self.scale = scale
+        self.qualifier = qualifier
+        self.suffix = suffix
+
+    def accepts(self, other: "Unit") -> bool:
+        """Whether a factor in `other` can be rescaled to this (requested) unit.
+        
+        A request without a qualifier accepts any qualifier: "MWh" accepts
+        "kWh (Net CV)" and "kWh (Gross CV)".
+        """
+        return self.dimension == other.dimension and (not self.qualifier or self.qualifier == other.qualifier)
+
+    def label(self, other: "Unit") -> str:
+        """How a factor in `other` is labelled once rescaled to this unit."""
+        return self.text if self.qualifier else self.text + other.suffix
+
+@lru_cache(maxsize=4096)
+def parse_unit(text: Optional[str]) -> Optional[Unit]:
+    """Parse a unit string, or return None if it does not start with a known unit."""
+    if not text:
+        return None
+    words = list(_WORD_PATTERN.finditer(text.strip()))
+    for count in range(min(UNIT_MAX_WORDS, len(words)), 0, -1):
+        name = " ".join(word.group() for word in words[:count]).lower()
+        if name in UNIT_SCALES:
+            dimension, scale = UNIT_SCALES[name]
+            suffix = text.strip()[words[count - 1].end():]
+            # "(Net CV)" and "(net)" name the same basis
+            qualifier = " ".join(
+                word for word in suffix.lower().replace("(", " ").replace(")", " ").split() if word != "cv"
+            )
+            return Unit(text.strip(), dimension, scale, qualifier, suffix)
+    return None
+
+class UnitColumn:
+    """Parsed units of one unit column of a factor table.
     
-    if search_params.category_level3:
-        filtered_factors = [
-            f for f in filtered_factors 
-            if f.get('category', {}).get('level3') and 
-               search_params.category_level3.lower() in f['category']['level3'].lower()
-        ]
+    Each distinct unit string is parsed once at load time. `scales` holds every
+    row's scale to its dimension's base unit (1 where the unit is not known), so
+    a set of factors is rescaled with one gather-divide.
+    """
+
+    def __init__(self, table: FactorTable, column: str):
+        self.size = len(table)
+        self.units: Dict[int, Unit] = {}
+        # Unit strings the registry does not know -> factor count; they only match themselves
+        self.unrecognised: Dict[str, int] = {}
+        self.positions: Dict[int, np.ndarray] = {}
+        self.scales = np.ones(len(table), dtype=np.float64)
+        for code, positions in _positions_by_code(table.codes[column]):
+            self.positions[code] = positions.astype(np.int32)
+            unit = parse_unit(table.strings[code])
+            if unit is not None:
+                self.units[code] = unit
+                self.scales[positions] = unit.scale
+            else:
+                self.unrecognised[table.strings[code]] = len(positions)
+
+    def compatible(self, unit: Unit) -> np.ndarray:
+        """Sorted positions of the factors whose unit `unit` accepts."""
+        return _union(
+            [self.positions[code] for code, other in self.units.items() if unit.accepts(other)], self.size
+        )
+
+    def compatible_count(self, unit: Unit) -> int:
+        """Number of factors whose unit `unit` accepts, without building the posting list."""
+        return sum(len(self.positions[code]) for code, other in self.units.items() if unit.accepts(other))
+
+    def multipliers(self, unit: Unit, positions: np.ndarray) -> np.ndarray:
+        """Per-factor multipliers taking quantities in `unit` to each factor's own unit."""
+        return unit.scale / self.scales[positions]
+
+    def groups(self) -> List[Dict[str, Any]]:
+        """Units present in the column, grouped by dimension and qualifier."""
+        groups: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for code, unit in self.units.items():
+            group = groups.setdefault((unit.dimension, unit.qualifier), {
+                "dimension": unit.dimension,
+                "base_unit": UNIT_BASES[unit.dimension],
+                "qualifier": unit.qualifier or None,
+                "units": {},
+                "factors": 0
+            })
+            group["units"][unit.text] = unit.scale
+            group["factors"] += len(self.positions[code])
+        return sorted(groups.values(), key=lambda group: (group["dimension"], group["qualifier"] or ""))
+
+# Indexes
+def _trigrams(value: str) -> Set[str]:
+    """Return the set of 3-character substrings of a string."""
+    return {value[i:i + 3] for i in range(len(value) - 2)}
+
+EMPTY_POSTINGS = np.zeros(0, dtype=np.int32)
+
+def _union(postings: List[np.ndarray], size: int) -> np.ndarray:
+    """Sorted union of sorted posting arrays over a table of `size` rows."""
+    if not postings:
+        return EMPTY_POSTINGS
+    if len(postings) == 1:
+        return postings[0]
+    total = sum(len(positions) for positions in postings)
+    if total * 16 < size:
+        return np.unique(np.concatenate(postings))
+    # Large unions (short search terms) are cheaper as a mask than a sort
+    mask = np.zeros(size, dtype=bool)
+    for positions in postings:
+        mask[positions] = True
+    return np.flatnonzero(mask).astype(np.int32)
+
+class SubstringIndex:
+    """Posting lists keyed by distinct lowercase value, with a trigram index for substring lookups.
     
-    # Filter by units
-    if search_params.activity_unit:
-        filtered_factors = [
-            f for f in filtered_factors 
-            if f.get('units', {}).get('activity_unit') and 
-               search_params.activity_unit.lower() in f['units']['activity_unit'].lower()
-        ]
+    Posting lists are sorted int32 position arrays.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.postings: Dict[str, np.ndarray] = {}
+        self._trigrams: Dict[str, Set[str]] = {}
+
+    def add(self, value: str, positions: np.ndarray) -> None:
+        """Record that the factors at `positions` have `value`."""
+        key = value.lower()
+        postings = self.postings.get(key)
+        if postings is None:
+            for gram in _trigrams(key):
+                self._trigrams.setdefault(gram, set()).add(key)
+            self.postings[key] = np.unique(positions).astype(np.int32)
+        else:
+            self.postings[key] = np.union1d(postings, positions).astype(np.int32)
+
+    def _matching_keys(self, term: str) -> List[str]:
+        term = term.lower()
+        candidates: Iterable[str] = self.postings.keys()
+        if len(term) >= 3:
+            gram_sets = sorted((self._trigrams.get(gram, set()) for gram in _trigrams(term)), key=len)
+            candidates = set.intersection(*gram_sets)
+        return [key for key in candidates if term in key]
+
+    def lookup(self, term: str) -> np.ndarray:
+        """Return sorted positions of factors whose value contains `term` (case-insensitive)."""
+        return _union([self.postings[key] for key in self._matching_keys(term)], self.size)
+
+    def cost(self, term: str) -> int:
+        """Posting entries a lookup of `term` reads."""
+        return sum(len(self.postings[key]) for key in self._matching_keys(term))
+
+def _encode_column(values: List[Optional[str]]) -> Tuple[List[str], np.ndarray]:
+    """Dictionary-encode a string column into (distinct names, int32 codes)."""
+    names: Dict[str, int] = {}
+    codes = np.fromiter(
+        (names.setdefault(value or "Unspecified", len(names)) for value in values),
+        dtype=np.int32, count=len(values)
+    )
+    return list(names), codes
+
+def _positions_by_code(codes: np.ndarray) -> Iterator[Tuple[int, np.ndarray]]:
+    """(code, ascending positions) for each non-null code in a code array."""
+    order = np.argsort(codes, kind="stable")
+    for group in np.split(order, np.flatnonzero(np.diff(codes[order])) + 1):
+        if len(group) and codes[group[0]] >= 0:
+            yield int(codes[group[0]]), group
+
+# Columns counted in search responses, keyed by the SearchRequest filter each value can be fed back into
+FACET_COLUMNS = {"scope": "scope", "category_level1": "category.level1", "activity_unit": "units.activity_unit"}
+# Set bits per 16-bit value, for numpy releases without bitwise_count
+_WORD_POPCOUNT = np.unpackbits(np.arange(1 << 16, dtype=np.uint16).view(np.uint8)).reshape(-1, 16).sum(
+    axis=1, dtype=np.uint8
+)
+
+def _popcount_rows(bitsets: np.ndarray) -> np.ndarray:
+    """Number of set bits in each row of a uint64 bitset matrix."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(bitsets).sum(axis=1, dtype=np.int64)
+    return _WORD_POPCOUNT[bitsets.view(np.uint16)].sum(axis=1, dtype=np.int64)
+
+class FacetIndex:
+    """Per-value bitsets of the facet columns, for counting a match set by value.
+    
+    Each facet is a (values x words) matrix of uint64 bitsets with one bit per
+    table row. A match set is packed into the same layout once and counted
+    against every value with an AND and a popcount, so the cost depends on the
+    table size and number of values, not on how many rows matched.
+    """
+
+    def __init__(self, table: FactorTable):
+        self.size = len(table)
+        self.words = -(-len(table) // 64)
+        self.names: Dict[str, List[str]] = {}
+        self.bitsets: Dict[str, np.ndarray] = {}
+        for facet, column in FACET_COLUMNS.items():
+            values = [
+                (table.strings[code], positions)
+                for code, positions in _positions_by_code(table.codes[column]) if table.strings[code]
+            ]
+            self.names[facet] = [name for name, _ in values]
+            self.bitsets[facet] = (
+                np.stack([self.pack(positions) for _, positions in values])
+                if values else np.zeros((0, self.words), dtype=np.uint64)
+            )
+        # Counts over the whole table, returned for unfiltered requests
+        self.totals = self._count(None)
+
+    def pack(self, positions: np.ndarray) -> np.ndarray:
+        """Bitset of a set of table positions."""
+        bits = np.zeros(self.words * 64, dtype=bool)
+        bits[positions] = True
+        return np.packbits(bits, bitorder="little").view(np.uint64)
+
+    def _count(self, match: Optional[np.ndarray]) -> Dict[str, Dict[str, int]]:
+        facets = {}
+        for facet, bitsets in self.bitsets.items():
+            counts = _popcount_rows(bitsets if match is None else bitsets & match)
+            names = self.names[facet]
+            facets[facet] = {
+                names[i]: int(counts[i]) for i in np.argsort(-counts, kind="stable").tolist() if counts[i]
+            }
+        return facets
+
+    def counts(self, positions: np.ndarray) -> Dict[str, Dict[str, int]]:
+        """Facet value counts over the factors at `positions`."""
+        if len(positions) == self.size:
+            return self.totals
+        return self._count(self.pack(positions))
+
+class FactorIndex:
+    """Load-time indexes over a table of conversion factors.
+    
+    Each filter of a `SearchRequest` resolves to a sorted array of table
+    positions; the arrays are intersected smallest first, so results come back
+    in file order and match the scan in `search_factors` exactly.
+    """
+
+    def __init__(self, table: FactorTable):
+        self.factors = table
+        self.scope = SubstringIndex(len(table))
+        self.category: Dict[str, SubstringIndex] = {}
+        self.activity_unit = SubstringIndex(len(table))
+        self.emission_unit = SubstringIndex(len(table))
+        self.tags = SubstringIndex(len(table))
+        self.position_by_id: Dict[str, int] = {}
+        # (category path, activity unit, emission unit), lowercased -> positions
+        self.by_path: Dict[Tuple, List[int]] = {}
+        # Lowercased category path -> positions, in any unit
+        self.by_category: Dict[Tuple[str, ...], List[int]] = {}
+        
+        # First occurrence wins, as with a scan
+        for position, factor_id in enumerate(table.ids):
+            self.position_by_id.setdefault(factor_id, position)
+        
+        # Posting lists are built once per distinct string rather than per row
+        strings = table.strings
+        def index_codes(index: SubstringIndex, codes: np.ndarray) -> None:
+            for code, positions in _positions_by_code(codes):
+                if strings[code]:
+                    index.add(strings[code], positions)
+        
+        index_codes(self.scope, table.codes["scope"])
+        for level in CATEGORY_LEVELS:
+            codes = table.codes[f"category.{level}"]
+            if any(strings[code] for code in table.distinct_codes(f"category.{level}").tolist()):
+                index_codes(self.category.setdefault(level, SubstringIndex(len(table))), codes)
+        index_codes(self.activity_unit, table.codes["units.activity_unit"])
+        index_codes(self.emission_unit, table.codes["units.emission_unit"])
+        for code, entries in _positions_by_code(table.tag_codes):
+            self.tags.add(strings[code], table.tag_rows()[entries])
+        
+        path_columns = [f"category.{level}" for level in CATEGORY_LEVELS] + ["units.activity_unit", "units.emission_unit"]
+        path_keys: Dict[Tuple[int, ...], Tuple] = {}
+        for position, codes in enumerate(zip(*(table.codes[column].tolist() for column in path_columns))):
+            path_key = path_keys.get(codes)
+            if path_key is None:
+                values = [strings[code] if code >= 0 else None for code in codes]
+                path_key = path_keys[codes] = (
+                    tuple(value.lower() for value in values[:-2] if value),
+                    (values[-2] or '').lower(),
+                    (values[-1] or '').lower()
+                )
+            self.by_path.setdefault(path_key, []).append(position)
+            self.by_category.setdefault(path_key[0], []).append(position)
+        
+        self.activity_units = UnitColumn(table, "units.activity_unit")
+        self.emission_units = UnitColumn(table, "units.emission_unit")
+        self.facets = FacetIndex(table)
+        
+        # Sorted conversion_factor values for range queries; NaN never satisfies a range filter
+        order = np.argsort(table.values, kind="stable")
+        order = order[~np.isnan(table.values[order])]
+        self.sorted_values = table.values[order]
+        self.sorted_positions = order.astype(np.int32)
+        
+        # Array-backed columns for vectorized calculations
+        self.values = table.values
+        self.scope_names, self.scope_codes = _encode_column(table.column_strings("scope"))
+        self.level1_names, self.level1_codes = _encode_column(table.column_strings("category.level1"))
+
+    def _category_lookup(self, level: str, term: str) -> np.ndarray:
+        index = self.category.get(level)
+        return index.lookup(term) if index else EMPTY_POSTINGS
+
+    def _text_lookup(self, term: str) -> np.ndarray:
+        lookups = [self.tags.lookup(term)] + [index.lookup(term) for index in self.category.values()]
+        return _union(lookups, len(self.factors))
+
+    def _range_bounds(self, min_factor: Optional[float], max_factor: Optional[float]) -> Tuple[int, int]:
+        lo = np.searchsorted(self.sorted_values, min_factor, side="left") if min_factor is not None else 0
+        hi = (
+            np.searchsorted(self.sorted_values, max_factor, side="right")
+            if max_factor is not None else len(self.sorted_values)
+        )
+        return int(lo), int(hi)
+
+    def _range_lookup(self, min_factor: Optional[float], max_factor: Optional[float]) -> np.ndarray:
+        lo, hi = self._range_bounds(min_factor, max_factor)
+        return np.sort(self.sorted_positions[lo:hi])
+
+    def search_cost(self, search_params: SearchRequest) -> int:
+        """Estimated posting entries `search_positions` reads for a request; none without filters."""
+        cost = 0
+        if search_params.scope:
+            cost += self.scope.cost(search_params.scope)
+        for level, term in (("level1", search_params.category_level1), ("level2", search_params.category_level2),
+                            ("level3", search_params.category_level3)):
+            if term and level in self.category:
+                cost += self.category[level].cost(term)
+        if search_params.activity_unit:
+            cost += self.activity_unit.cost(search_params.activity_unit)
+        if search_params.emission_unit:
+            cost += self.emission_unit.cost(search_params.emission_unit)
+        if search_params.search_term:
+            cost += self.tags.cost(search_params.search_term)
+            cost += sum(index.cost(search_params.search_term) for index in self.category.values())
+        
+        if search_params.unit:
+            unit = parse_unit(search_params.unit)
+            cost += self.activity_units.compatible_count(unit) if unit else 0
+        elif search_params.min_factor is not None or search_params.max_factor is not None:
+            lo, hi = self._range_bounds(search_params.min_factor, search_params.max_factor)
+            cost += max(0, hi - lo)
+        return cost
+
+    def search(self, search_params: SearchRequest) -> List[FactorRow]:
+        """Evaluate a search request by intersecting posting lists."""
+        return [self.factors[position] for position in self.search_positions(search_params).tolist()]
+
+    def search_positions(self, search_params: SearchRequest) -> np.ndarray:
+        """Positions of the factors matching a search request, in file order."""
+        posting_sets = []
+        
+        if search_params.scope:
+            posting_sets.append(self.scope.lookup(search_params.scope))
+        if search_params.category_level1:
+            posting_sets.append(self._category_lookup('level1', search_params.category_level1))
+        if search_params.category_level2:
+            posting_sets.append(self._category_lookup('level2', search_params.category_level2))
+        if search_params.category_level3:
+            posting_sets.append(self._category_lookup('level3', search_params.category_level3))
+        if search_params.activity_unit:
+            posting_sets.append(self.activity_unit.lookup(search_params.activity_unit))
+        if search_params.emission_unit:
+            posting_sets.append(self.emission_unit.lookup(search_params.emission_unit))
+        if search_params.search_term:
+            posting_sets.append(self._text_lookup(search_params.search_term))
+        
+        unit = parse_unit(search_params.unit) if search_params.unit else None
+        has_range = search_params.min_factor is not None or search_params.max_factor is not None
+        if search_params.unit:
+            posting_sets.append(self.activity_units.compatible(unit) if unit else EMPTY_POSTINGS)
+        elif has_range:
+            posting_sets.append(self._range_lookup(search_params.min_factor, search_params.max_factor))
+        
+        if not posting_sets:
+            return np.arange(len(self.factors), dtype=np.int32)
+        
+        posting_sets.sort(key=len)
+        matches = posting_sets[0]
+        for postings in posting_sets[1:]:
+            if not len(matches):
+                break
+            matches = np.intersect1d(matches, postings, assume_unique=True)
+        
+        # With a unit, the range applies to the factors once rescaled to it
+        if unit is not None and has_range and len(matches):
+            values = self.values[matches] * self.activity_units.multipliers(unit, matches)
+            in_range = np.ones(len(matches), dtype=bool)
+            if search_params.min_factor is not None:
+                in_range &= values >= search_params.min_factor
+            if search_params.max_factor is not None:
+                in_range &= values <= search_params.max_factor
+            matches = matches[in_range]
+        
+        return matches
+
+    def rescaled_records(self, positions: List[int], unit: Unit) -> List[Dict[str, Any]]:
+        """Records of the factors at `positions` expressed per `unit`.
+        
+        Each factor must be in a unit that `unit` accepts; conversion_factor is
+        rescaled and the activity unit relabelled, keeping the factor's qualifier.
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        values = self.values[positions] * self.activity_units.multipliers(unit, positions)
+        codes = self.factors.codes["units.activity_unit"][positions]
+        records = []
+        for position, code, value in zip(positions.tolist(), codes.tolist(), values.tolist()):
+            record = self.factors.record(position)
+            record["conversion_factor"] = value
+            record["units"]["activity_unit"] = unit.label(self.activity_units.units[code])
+            records.append(record)
+        return records
+
+# Ranked full-text search
+BM25_K1 = 1.2
+BM25_B = 0.75
+FUZZY_MIN_SIMILARITY = 0.6
+FUZZY_MAX_EXPANSIONS = 3
+FUZZY_SIMILARITY_MARGIN = 0.1
+FUZZY_CANDIDATE_DICE = 0.3
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9_]+")
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase search tokens, dropping single characters."""
+    return [token for token in _TOKEN_PATTERN.findall(text.lower()) if len(token) > 1]
+
+def _padded_trigrams(term: str) -> Set[str]:
+    """Trigrams of a term padded at both ends, so short terms and word edges count."""
+    return _trigrams(f"  {term} ")
+
+def _edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance counting an adjacent transposition as one edit."""
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        previous2, previous = previous, current
+    return previous[len(b)]
+
+class RankedSearchIndex:
+    """BM25 inverted index over factor tag tokens, with fuzzy term expansion.
     
-    if search_params.emission_unit:
-        filtered_factors = [
-            f for f in filtered_factors 
-            if f.get('units', {}).get('emission_unit') and 
-               search_params.emission_unit.lower() in f['units']['emission_unit'].lower()
+    Documents are the tokens of each factor's tags. The BM25 contribution of
+    every posting is computed once at load time, so scoring a query is a few
+    vectorized array updates. Query terms missing from the vocabulary are
+    expanded to vocabulary terms sharing padded trigrams, ranked by edit
+    distance, so "diesal" and "natrual gas" still find diesel and natural gas.
+    """
+
+    def __init__(self, table: FactorTable):
+        self.size = len(table)
+        postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        lengths = np.zeros(self.size, dtype=np.float64)
+        
+        # Each distinct tag is tokenized once
+        tokens_by_code: Dict[int, List[str]] = {}
+        offsets = table.tag_offsets.tolist()
+        tag_codes = table.tag_codes.tolist()
+        for position in range(self.size):
+            counts: Dict[str, int] = {}
+            for code in tag_codes[offsets[position]:offsets[position + 1]]:
+                tokens = tokens_by_code.get(code)
+                if tokens is None:
+                    tokens = tokens_by_code[code] = tokenize(table.strings[code])
+                for token in tokens:
+                    counts[token] = counts.get(token, 0) + 1
+            lengths[position] = sum(counts.values())
+            for token, count in counts.items():
+                docs, tfs = postings.setdefault(token, ([], []))
+                docs.append(position)
+                tfs.append(count)
+        
+        # term -> (positions, per-posting BM25 contribution)
+        self.postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        average_length = lengths.mean() if self.size else 0.0
+        for term, (docs, tfs) in postings.items():
+            positions = np.array(docs, dtype=np.int64)
+            tf = np.array(tfs, dtype=np.float64)
+            idf = np.log(1 + (self.size - len(docs) + 0.5) / (len(docs) + 0.5))
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[positions] / (average_length or 1))
+            self.postings[term] = (positions, idf * tf * (BM25_K1 + 1) / (tf + norm))
+        
+        self._trigrams: Dict[str, Set[str]] = {}
+        for term in self.postings:
+            for gram in _padded_trigrams(term):
+                self._trigrams.setdefault(gram, set()).add(term)
+
+    def expand(self, token: str, fuzzy: bool = True) -> List[Tuple[str, float]]:
+        """Vocabulary terms matched by a query token, as (term, similarity) pairs."""
+        if token in self.postings:
+            return [(token, 1.0)]
+        if not fuzzy:
+            return []
+        
+        grams = _padded_trigrams(token)
+        shared: Dict[str, int] = {}
+        for gram in grams:
+            for term in self._trigrams.get(gram, ()):
+                shared[term] = shared.get(term, 0) + 1
+        
+        matches = []
+        for term, count in shared.items():
+            if 2 * count / (len(grams) + len(term) + 1) < FUZZY_CANDIDATE_DICE:
+                continue
+            similarity = 1 - _edit_distance(token, term) / max(len(token), len(term))
+            if similarity >= FUZZY_MIN_SIMILARITY:
+                matches.append((term, round(similarity, 3)))
+        matches.sort(key=lambda match: (-match[1], match[0]))
+        # Only the closest spellings; a rarer, more distant term would otherwise outrank them
+        return [match for match in matches[:FUZZY_MAX_EXPANSIONS]
+                if match[1] >= matches[0][1] - FUZZY_SIMILARITY_MARGIN]
+
+    def cost(self, query: str, fuzzy: bool = True) -> int:
+        """Estimated work of scoring a query: the postings of known terms, and for
+        unknown terms the vocabulary entries compared during fuzzy expansion."""
+        cost = 0
+        for token in dict.fromkeys(tokenize(query)):
+            if token in self.postings:
+                cost += len(self.postings[token][0])
+            elif fuzzy:
+                cost += sum(len(self._trigrams.get(gram, ())) for gram in _padded_trigrams(token))
+        return cost
+
+    def search(self, query: str, limit: int, allowed: Optional[Set[int]] = None,
+               fuzzy: bool = True) -> Tuple[List[Tuple[int, float]], int, List[Dict[str, Any]]]:
+        """Score factors against a query and return the top `limit`.
+        
+        Returns ((position, score) pairs best first, number of matching
+        factors, per-token expansions). A fuzzy match contributes its BM25
+        score scaled by its similarity; when a token expands to several
+        terms, each factor keeps only its best-scoring one.
+        """
+        scores = np.zeros(self.size, dtype=np.float64)
+        terms = []
+        for token in dict.fromkeys(tokenize(query)):
+            expansions = self.expand(token, fuzzy)
+            terms.append({"token": token, "matches": [
+                {"term": term, "similarity": similarity} for term, similarity in expansions
+            ]})
+            if len(expansions) == 1:
+                positions, contributions = self.postings[expansions[0][0]]
+                scores[positions] += expansions[0][1] * contributions
+            elif expansions:
+                best = np.zeros(self.size, dtype=np.float64)
+                for term, similarity in expansions:
+                    positions, contributions = self.postings[term]
+                    best[positions] = np.maximum(best[positions], similarity * contributions)
+                scores += best
+        
+        candidates = np.flatnonzero(scores)
+        if allowed is not None:
+            candidates = candidates[np.isin(candidates, np.fromiter(allowed, dtype=np.int64, count=len(allowed)))]
+        
+        # Highest score first, file order between equal scores
+        top = heapq.nlargest(limit, candidates.tolist(), key=lambda position: (scores[position], -position))
+        return [(position, float(scores[position])) for position in top], len(candidates), terms
+
+def resolve_activity_rows(index: FactorIndex, rows: List[ActivityRow],
+                          emission_unit: str = "kg CO2e") -> Tuple[np.ndarray, np.ndarray, Dict[int, str]]:
+    """Resolve activity rows to factor positions by ID or category path.
+    
+    Returns each row's position (-1 where it failed), the multiplier taking its
+    quantity into the factor's activity unit, and an error message per failed row.
+    """
+    emission_unit = emission_unit.lower()
+    requested_emission_unit = parse_unit(emission_unit)
+    position_by_id = index.position_by_id
+    activity_units = index.activity_units
+    activity_codes = index.factors.codes["units.activity_unit"]
+    positions = [-1] * len(rows)
+    # Scale of each row's unit to its dimension's base unit; NaN where the row is in the factor's own unit
+    row_scales = np.full(len(rows), np.nan)
+    errors: Dict[int, str] = {}
+    # Category path rows resolve once per distinct (path, unit, column text)
+    resolved_paths: Dict[Tuple, Tuple[int, Optional[str]]] = {}
+    
+    def accepts(unit: Optional[Unit], units: UnitColumn, code: int) -> bool:
+        other = units.units.get(code)
+        return unit is not None and other is not None and unit.accepts(other)
+    
+    def resolve_path(row: ActivityRow) -> Tuple[int, Optional[str]]:
+        path = tuple(level.lower() for level in row.category_path if level)
+        candidates = index.by_path.get((path, row.unit.lower(), emission_unit), [])
+        if not candidates:
+            # No factor in exactly this unit: take any with compatible activity and emission units
+            unit = parse_unit(row.unit)
+            emission_codes = index.factors.codes["units.emission_unit"]
+            candidates = [
+                p for p in index.by_category.get(path, [])
+                if accepts(unit, activity_units, activity_codes[p])
+                and ((index.factors.string("units.emission_unit", p) or '').lower() == emission_unit
+                     or accepts(requested_emission_unit, index.emission_units, emission_codes[p]))
+            ]
+        if row.column_text:
+            column_text = row.column_text.lower()
+            candidates = [
+                p for p in candidates if (index.factors.string("column_text", p) or '').lower() == column_text
+            ]
+        if not candidates:
+            return -1, f"No {emission_unit} factor for {' > '.join(row.category_path)} in {row.unit}"
+        if len(candidates) > 1:
+            return -1, f"{len(candidates)} factors match {' > '.join(row.category_path)}; give column_text or factor_id"
+        return candidates[0], None
+    
+    for i, row in enumerate(rows):
+        if row.factor_id:
+            position = position_by_id.get(row.factor_id)
+            if position is None:
+                errors[i] = f"Conversion factor {row.factor_id} not found"
+                continue
+        elif row.category_path:
+            if not row.unit:
+                errors[i] = "A unit is required with a category path"
+                continue
+            key = (tuple(row.category_path), row.unit.lower(), (row.column_text or '').lower())
+            resolved_path = resolved_paths.get(key)
+            if resolved_path is None:
+                resolved_path = resolved_paths[key] = resolve_path(row)
+            position, error = resolved_path
+            if error:
+                errors[i] = error
+                continue
+        else:
+            errors[i] = "Either factor_id or category_path is required"
+            continue
+        
+        if row.unit:
+            activity_unit = index.factors.string("units.activity_unit", position)
+            if (activity_unit or '').lower() != row.unit.lower():
+                unit = parse_unit(row.unit)
+                if not accepts(unit, activity_units, activity_codes[position]):
+                    errors[i] = f"Unit {row.unit} is not compatible with factor unit {activity_unit}"
+                    continue
+                row_scales[i] = unit.scale
+        positions[i] = position
+    
+    positions = np.array(positions, dtype=np.int64)
+    factor_scales = activity_units.scales[np.maximum(positions, 0)]
+    multipliers = np.where(np.isnan(row_scales), 1.0, row_scales / factor_scales)
+    return positions, multipliers, errors
+
+def activity_emissions(index: FactorIndex, rows: List[ActivityRow], positions: np.ndarray,
+                       multipliers: np.ndarray, errors: Dict[int, str]) -> np.ndarray:
+    """kg CO2e of each row (0 where it failed), in one gather-multiply.
+    
+    Rows whose emissions overflow a float are failed with an error in `errors`
+    and `positions` set to -1, so every total is over finite values.
+    """
+    quantities = np.fromiter((row.quantity for row in rows), dtype=np.float64, count=len(rows))
+    resolved = positions >= 0
+    emissions = np.zeros(len(rows), dtype=np.float64)
+    with np.errstate(over="ignore", invalid="ignore"):
+        emissions[resolved] = index.values[positions[resolved]] * multipliers[resolved] * quantities[resolved]
+    overflowed = ~np.isfinite(emissions)
+    for i in np.flatnonzero(overflowed).tolist():
+        errors[i] = f"Emissions for quantity {rows[i].quantity} exceed the representable range"
+    positions[overflowed] = -1
+    emissions[overflowed] = 0.0
+    return emissions
+
+def require_finite_totals(*totals: Union[float, np.ndarray]) -> None:
+    """Reject a calculation whose totals overflow, though every row is finite."""
+    if not all(np.isfinite(total).all() for total in totals):
+        raise HTTPException(status_code=422, detail="Total emissions exceed the representable range")
+
+def calculate_emissions(index: FactorIndex, rows: List[ActivityRow], emission_unit: str = "kg CO2e",
+                        include_rows: bool = True) -> Dict[str, Any]:
+    """Calculate kg CO2e for a batch of activity rows.
+    
+    Rows are resolved to factor positions by dict lookup, then the emissions are
+    computed in one gather-multiply over the index's value array and reduced into
+    scope and category totals with bincount. A row whose unit differs from its
+    factor's but is compatible with it is converted by the same multiply, through
+    the row's unit scale over the factor's.
+    """
+    positions, multipliers, errors = resolve_activity_rows(index, rows, emission_unit)
+    
+    # Gather, convert units, multiply and reduce over the resolved rows
+    emissions = activity_emissions(index, rows, positions, multipliers, errors)
+    resolved = positions >= 0
+    resolved_positions = positions[resolved]
+    
+    by_scope = np.bincount(
+        index.scope_codes[resolved_positions], weights=emissions[resolved], minlength=len(index.scope_names)
+    )
+    by_category = np.bincount(
+        index.level1_codes[resolved_positions], weights=emissions[resolved], minlength=len(index.level1_names)
+    )
+    used_scopes = np.bincount(index.scope_codes[resolved_positions], minlength=len(index.scope_names)) > 0
+    used_categories = np.bincount(index.level1_codes[resolved_positions], minlength=len(index.level1_names)) > 0
+    with np.errstate(over="ignore"):
+        total = emissions.sum()
+    require_finite_totals(total, by_scope, by_category)
+    
+    result = {
+        "total_kg_co2e": float(total),
+        "rows_calculated": int(resolved.sum()),
+        "rows_failed": len(errors),
+        "by_scope": {name: float(by_scope[code]) for code, name in enumerate(index.scope_names) if used_scopes[code]},
+        "by_category": {
+            name: float(by_category[code]) for code, name in enumerate(index.level1_names) if used_categories[code]
+        }
+    }
+    
+    if include_rows:
+        ids = index.factors.ids
+        # Per unit of the row's quantity, so kg_co2e = quantity * conversion_factor
+        factor_values = np.where(resolved, index.values[np.maximum(positions, 0)] * multipliers, np.nan).tolist()
+        result["rows"] = [
+            {
+                "index": i,
+                "factor_id": ids[position],
+                "quantity": quantity,
+                "conversion_factor": factor_value,
+                "kg_co2e": kg_co2e,
+                "error": None
+            }
+            if position >= 0 else {
+                "index": i,
+                "factor_id": rows[i].factor_id,
+                "quantity": quantity,
+                "conversion_factor": None,
+                "kg_co2e": None,
+                "error": errors.get(i)
+            }
+            for i, (position, quantity, factor_value, kg_co2e) in enumerate(
+                zip(positions.tolist(), [row.quantity for row in rows], factor_values, emissions.tolist())
+            )
         ]
+    elif errors:
+        result["errors"] = [{"index": i, "error": error} for i, error in errors.items()]
+    
+    return result
+
+# Quick lookups
+QUICK_LOOKUP_MAX_EXTRA_TERMS = 4096
+
+def _lookup_eligible(table: FactorTable, spec: Dict[str, Any]) -> List[int]:
+    """Positions of the factors passing a lookup's tag, scope and category filters."""
+    mask = np.ones(len(table), dtype=bool)
+    if spec.get("tags"):
+        mask &= table.rows_where("tags", lambda tag: tag in spec["tags"])
+    if spec.get("scopes"):
+        mask &= table.rows_where("scope", lambda scope: scope in spec["scopes"])
+    if spec.get("level1"):
+        mask &= table.rows_where("category.level1", lambda level1: level1 in spec["level1"])
+    if spec.get("level1_contains"):
+        mask &= table.rows_where(
+            "category.level1", lambda level1: any(part in level1.lower() for part in spec["level1_contains"])
+        )
+    return np.flatnonzero(mask).tolist()
+
+class TermLookupTable:
+    """First `limit` positions of the factors with a tag containing a term.
+    
+    Answers are precomputed for every distinct tag among the eligible factors;
+    other terms are matched against those tags once and remembered.
+    """
+
+    def __init__(self, table: FactorTable, positions: List[int], limit: int):
+        self.limit = limit
+        self._by_tag: Dict[str, List[int]] = {}
+        for position in positions:
+            for tag in {tag.lower() for tag in table.tags(position)}:
+                self._by_tag.setdefault(tag, []).append(position)
+        self._answers = {tag: self._match(tag) for tag in self._by_tag}
+        self._extra_terms = 0
+        self._entries = sum(len(positions) for positions in self._by_tag.values())
+
+    def _match(self, term: str) -> List[int]:
+        matches: Set[int] = set()
+        for tag, positions in self._by_tag.items():
+            if term in tag:
+                matches.update(positions)
+        return heapq.nsmallest(self.limit, matches)
+
+    def cost(self, term: str) -> int:
+        """Factor rows `get` touches: none for a remembered term."""
+        return 0 if term.lower() in self._answers else self._entries
+
+    def get(self, term: str) -> List[int]:
+        term = term.lower()
+        answer = self._answers.get(term)
+        if answer is None:
+            answer = self._match(term)
+            if self._extra_terms < QUICK_LOOKUP_MAX_EXTRA_TERMS:
+                self._extra_terms += 1
+                self._answers[term] = answer
+        return answer
+
+class QuickLookupTables:
+    """Load-time tables behind /quick-lookup, defined by the quick lookup config.
+    
+    A "flag" lookup is a fixed list of positions; a "term" lookup is a
+    `TermLookupTable`. Results of the requested lookups are concatenated in
+    config order and deduplicated by factor ID.
+    """
+
+    def __init__(self, table: FactorTable, index: FactorIndex, config: Dict[str, Any]):
+        self.table = table
+        self.index = index
+        self.max_results = config.get("max_results", 20)
+        self.specs: Dict[str, Dict[str, Any]] = {}
+        self.tables: Dict[str, Union[List[int], TermLookupTable]] = {}
+        for spec in config.get("lookups", []):
+            limit = spec.get("limit", 10)
+            positions = _lookup_eligible(table, spec)
+            self.specs[spec["name"]] = spec
+            if spec.get("type") == "flag":
+                self.tables[spec["name"]] = positions[:limit]
+            else:
+                self.tables[spec["name"]] = TermLookupTable(table, positions, limit)
+
+    def cost(self, params: Dict[str, Any]) -> int:
+        """Estimated factor rows a lookup touches."""
+        return sum(
+            table.cost(str(params[name])) for name, table in self.tables.items()
+            if params.get(name) and isinstance(table, TermLookupTable)
+        )
+
+    def lookup(self, params: Dict[str, Any]) -> Tuple[List[int], int]:
+        """Positions to return for the requested lookups, and the total before truncation."""
+        positions: List[int] = []
+        for name, table in self.tables.items():
+            value = params.get(name)
+            if not value:
+                continue
+            positions.extend(table if isinstance(table, list) else table.get(str(value)))
+        
+        seen_ids: Set[str] = set()
+        unique: List[int] = []
+        for position in positions:
+            factor_id = self.table.ids[position]
+            if factor_id not in seen_ids:
+                seen_ids.add(factor_id)
+                # Duplicate IDs resolve to the first factor with that ID
+                unique.append(self.index.position_by_id[factor_id])
+        return unique[:self.max_results], len(unique)
+
+# Category tree
+CATEGORY_TREE_VECTORIZE_MIN = 64
+
+class CategoryNode:
+    """One node of the category tree; `summary` holds its precomputed aggregates."""
+    __slots__ = ("name", "level", "path", "children", "positions", "summary")
+
+    def __init__(self, name: str, level: int, path: List[str]):
+        self.name = name
+        self.level = level
+        self.path = path
+        # Keyed by lowercased name, in order of first appearance
+        self.children: Dict[str, "CategoryNode"] = {}
+        self.positions: List[int] = []
+        self.summary: Dict[str, Any] = {}
+
+class CategoryTree:
+    """Category trie (level1 -> level4) with per-node aggregates built at load time.
+    
+    Each node records its factor count, scope breakdown, activity and emission
+    unit sets and min/max/median conversion factor. Factor positions are only
+    kept while the aggregates are computed.
+    """
+
+    def __init__(self, table: FactorTable, index: FactorIndex):
+        self.root = CategoryNode("All categories", 0, [])
+        level_columns = [table.column_strings(f"category.{name}") for name in CATEGORY_LEVELS]
+        for position, category in enumerate(zip(*level_columns)):
+            node = self.root
+            node.positions.append(position)
+            for level, value in enumerate(category, start=1):
+                if not value:
+                    break
+                child = node.children.get(str(value).lower())
+                if child is None:
+                    child = node.children[str(value).lower()] = CategoryNode(
+                        str(value), level, node.path + [str(value)]
+                    )
+                child.positions.append(position)
+                node = child
+        
+        activity_units, activity_codes = _encode_column(table.column_strings("units.activity_unit"))
+        emission_units, emission_codes = _encode_column(table.column_strings("units.emission_unit"))
+        columns = (
+            (index.scope_names, index.scope_codes),
+            (activity_units, activity_codes),
+            (emission_units, emission_codes)
+        )
+        self._summarize(self.root, index.values, columns, (index.values.tolist(), *(
+            codes.tolist() for _, codes in columns
+        )))
+
+    def _summarize(self, node: CategoryNode, values: np.ndarray, columns: Tuple, lists: Tuple) -> None:
+        (scope_names, scope_codes), (activity_names, activity_codes), (emission_names, emission_codes) = columns
+        if len(node.positions) >= CATEGORY_TREE_VECTORIZE_MIN:
+            positions = np.array(node.positions, dtype=np.int64)
+            node_values = values[positions]
+            node_values = node_values[~np.isnan(node_values)]
+            scope_counts = enumerate(np.bincount(scope_codes[positions], minlength=len(scope_names)).tolist())
+            activity_set = np.unique(activity_codes[positions]).tolist()
+            emission_set = np.unique(emission_codes[positions]).tolist()
+            stats = (node_values.min(), node_values.max(), np.median(node_values)) if len(node_values) else None
+        else:
+            # Small nodes, which dominate deep trees, are cheaper without numpy's per-call overhead
+            value_list, scope_list, activity_list, emission_list = lists
+            node_values = sorted(value for value in (value_list[p] for p in node.positions) if value == value)
+            counts: Dict[int, int] = {}
+            for position in node.positions:
+                counts[scope_list[position]] = counts.get(scope_list[position], 0) + 1
+            scope_counts = sorted(counts.items())
+            activity_set = {activity_list[position] for position in node.positions}
+            emission_set = {emission_list[position] for position in node.positions}
+            stats = (node_values[0], node_values[-1], statistics.median(node_values)) if node_values else None
+        
+        node.summary = {
+            "count": len(node.positions),
+            "scopes": {scope_names[code]: int(count) for code, count in scope_counts if count},
+            "activity_units": sorted(activity_names[code] for code in activity_set),
+            "emission_units": sorted(emission_names[code] for code in emission_set),
+            "factor_stats": {
+                "min": float(stats[0]),
+                "max": float(stats[1]),
+                "median": float(stats[2])
+            } if stats else None
+        }
+        node.positions = []
+        for child in node.children.values():
+            self._summarize(child, values, columns, lists)
+
+    def find(self, path: List[str]) -> Optional[CategoryNode]:
+        """Node at a path of category names (case-insensitive), or None."""
+        node = self.root
+        for name in path:
+            node = node.children.get(name.lower())
+            if node is None:
+                return None
+        return node
+
+    def to_dict(self, node: CategoryNode, depth: int) -> Dict[str, Any]:
+        """Serializable view of a node and `depth` levels of descendants."""
+        result = {"name": node.name, "level": node.level, "path": node.path, **node.summary}
+        if depth > 0:
+            result["children"] = [self.to_dict(child, depth - 1) for child in node.children.values()]
+        else:
+            result["child_count"] = len(node.children)
+        return result
+
+# Streaming export
+EXPORT_CHUNK_SIZE = 1000
+
+EXPORT_CSV_COLUMNS = [
+    "id", "scope", "category_level1", "category_level2", "category_level3", "category_level4",
+    "activity_unit", "emission_unit", "conversion_factor", "column_text", "year", "tags"
+]
+
+def iter_ndjson(fragments: List[bytes], positions: np.ndarray) -> Iterator[bytes]:
+    """Write pre-encoded factors as newline-delimited JSON, one chunk of rows at a time."""
+    for start in range(0, len(positions), EXPORT_CHUNK_SIZE):
+        chunk = positions[start:start + EXPORT_CHUNK_SIZE].tolist()
+        yield b"\n".join(fragments[position] for position in chunk) + b"\n"
+
+def iter_csv(table: FactorTable, positions: np.ndarray) -> Iterator[bytes]:
+    """Serialize the factors at `positions` as CSV with flattened category and unit columns.
+    
+    Rows are read from the table one chunk at a time, so memory stays flat
+    however many factors match.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_CSV_COLUMNS)
+    
+    for start in range(0, len(positions), EXPORT_CHUNK_SIZE):
+        for position in positions[start:start + EXPORT_CHUNK_SIZE].tolist():
+            factor = table[position]
+            category = factor.get('category', {})
+            units = factor.get('units', {})
+            writer.writerow([
+                factor["id"], factor.get('scope'),
+                category.get('level1'), category.get('level2'), category.get('level3'), category.get('level4'),
+                units.get('activity_unit'), units.get('emission_unit'),
+                factor.get('conversion_factor'), factor.get('column_text'), factor.get('year'),
+                ";".join(factor.get('tags', []))
+            ])
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+# Year-over-year comparison
+# Thresholds used by the published major changes analysis
+MAJOR_CHANGE_THRESHOLDS = {"Scope 1": 5.0, "Scope 2": 5.0, "Scope 3": 10.0}
+
+def _factor_key(factor: Dict) -> Tuple:
+    """Descriptive key identifying a factor independently of its ID."""
+    category = factor.get('category', {})
+    units = factor.get('units', {})
+    return (
+        factor.get('scope'),
+        category.get('level1'), category.get('level2'), category.get('level3'), category.get('level4'),
+        factor.get('column_text'),
+        units.get('activity_unit'), units.get('emission_unit')
+    )
+
+def diff_factors(old_factors: Iterable[Union[Dict, FactorRow]],
+                 new_factors: Iterable[Union[Dict, FactorRow]]) -> Dict[str, Any]:
+    """Match factors across two years and compute the change in each factor value.
+    
+    Factors are matched by ID first; any left over are matched by their descriptive
+    key (scope, category levels, column text and units) when that key is unique in
+    both years, which covers factors that were renumbered between publications.
+    """
+    # Factors are tracked by object identity, so row views must be created once
+    old_factors, new_factors = list(old_factors), list(new_factors)
+    old_by_id: Dict[str, Dict] = {}
+    for factor in old_factors:
+        old_by_id.setdefault(factor["id"], factor)
+    
+    pairs = []
+    matched_old: Set[int] = set()
+    unmatched_new = []
+    for factor in new_factors:
+        old = old_by_id.get(factor["id"])
+        if old is not None and id(old) not in matched_old:
+            pairs.append((old, factor))
+            matched_old.add(id(old))
+        else:
+            unmatched_new.append(factor)
+    
+    unmatched_old = [f for f in old_factors if id(f) not in matched_old]
+    old_by_key: Dict[Tuple, List[Dict]] = {}
+    for factor in unmatched_old:
+        old_by_key.setdefault(_factor_key(factor), []).append(factor)
+    new_by_key: Dict[Tuple, List[Dict]] = {}
+    for factor in unmatched_new:
+        new_by_key.setdefault(_factor_key(factor), []).append(factor)
+    
+    for key, candidates in new_by_key.items():
+        old_candidates = old_by_key.get(key, [])
+        if len(candidates) == 1 and len(old_candidates) == 1:
+            pairs.append((old_candidates[0], candidates[0]))
+            matched_old.add(id(old_candidates[0]))
+    matched_new = {id(new) for _, new in pairs}
+    
+    changes = []
+    unchanged = 0
+    for old, new in pairs:
+        old_value = old.get('conversion_factor', 0)
+        new_value = new.get('conversion_factor', 0)
+        if old_value == new_value:
+            unchanged += 1
+            continue
+        
+        change_percentage = (new_value - old_value) / abs(old_value) * 100 if old_value else None
+        threshold = MAJOR_CHANGE_THRESHOLDS.get(new.get('scope'))
+        changes.append({
+            "from_id": old["id"],
+            "to_id": new["id"],
+            "scope": new.get('scope'),
+            "category": new.get('category', {}),
+            "units": new.get('units', {}),
+            "column_text": new.get('column_text'),
+            "old_factor": old_value,
+            "new_factor": new_value,
+            "change": new_value - old_value,
+            "change_percentage": round(change_percentage, 4) if change_percentage is not None else None,
+            "major": threshold is not None and (change_percentage is None or abs(change_percentage) > threshold)
+        })
+    
+    # Largest relative changes first; changes from a zero factor have no percentage
+    changes.sort(key=lambda c: (c["change_percentage"] is not None, abs(c["change_percentage"] or 0)), reverse=True)
+    
+    return {
+        "summary": {
+            "matched": len(pairs),
+            "changed": len(changes),
+            "unchanged": unchanged,
+            "added": len(new_factors) - len(matched_new),
+            "removed": len(old_factors) - len(matched_old),
+            "major": sum(1 for c in changes if c["major"])
+        },
+        "changes": changes,
+        "added": [f["id"] for f in new_factors if id(f) not in matched_new],
+        "removed": [f["id"] for f in old_factors if id(f) not in matched_old]
+    }
+
+# Major changes
+# Abbreviations used in the major changes document for column text values
+MAJOR_CHANGE_ALIASES = {
+    "phev": "plug-in hybrid electric vehicle",
+    "phevs": "plug-in hybrid electric vehicle",
+    "bev": "battery electric vehicle",
+    "bevs": "battery electric vehicle"
+}
+# "WTT – bioenergy" and "WTT- bioenergy" name the same category
+_DASH_PATTERN = re.compile(r"\s*[–—-]\s*")
+# Subcategories list nested levels separated by a spaced dash, e.g. "Cars (by market segment) – Sports, PHEVs"
+_SUBCATEGORY_SEPARATOR = re.compile(r"\s+[–—-]\s+|\s*,\s*")
+_LIST_SEPARATOR = re.compile(r"\s*,\s*|\s+and\s+")
+_GAS_PATTERN = re.compile(r"\bof (\S+) per unit\b")
+# Fields an entry is matched on below level 1
+MAJOR_CHANGE_COLUMNS = (
+    "category.level2", "category.level3", "category.level4", "column_text",
+    "units.activity_unit", "units.emission_unit"
+)
+
+def _normalize_name(name: Optional[str]) -> str:
+    return " ".join(_DASH_PATTERN.sub("-", (name or "").lower()).split())
+
+def change_bounds(change: Dict[str, Any]) -> Tuple[float, float]:
+    """Lower and upper change percentage of a major change entry (NaN if it gives none)."""
+    if change.get("change_percentage") is not None:
+        return float(change["change_percentage"]), float(change["change_percentage"])
+    bounds = change.get("change_percentage_range") or []
+    if len(bounds) == 2:
+        return float(min(bounds)), float(max(bounds))
+    return math.nan, math.nan
+
+class MajorChangeIndex:
+    """Join of the major changes document to the factors each entry affects.
+    
+    An entry's category is matched against level 1, its subcategory against the
+    lower levels and column text (every listed term has to match; "All factors"
+    or a repeat of the category matches everything), its GHG unit against the
+    gas of the emission unit and its unit against the activity unit, once per
+    distinct combination of those fields. Per factor `low`/`high` hold the
+    entry's change bounds in percent (NaN where no entry applies) and `entry`
+    its number (-1), so impacts are computed by gathers.
+    """
+
+    def __init__(self, table: FactorTable, changes: List[Dict[str, Any]]):
+        self.changes = changes
+        self.positions: List[np.ndarray] = []
+        self.entry = np.full(len(table), -1, dtype=np.int32)
+        self.low = np.full(len(table), np.nan)
+        self.high = np.full(len(table), np.nan)
+        level1_codes = table.codes["category.level1"]
+        level1_names = {code: _normalize_name(table.strings[code]) for code in np.unique(level1_codes) if code >= 0}
+        fields = np.stack([table.codes[column] for column in MAJOR_CHANGE_COLUMNS], axis=1)
+        
+        for number, change in enumerate(changes):
+            category = _normalize_name(change.get("category"))
+            codes = [code for code, name in level1_names.items() if name == category]
+            candidates = np.flatnonzero(np.isin(level1_codes, codes))
+            keys, inverse = np.unique(fields[candidates], axis=0, return_inverse=True)
+            matched = np.array([
+                self._matches(change, category, [table.strings[code] if code >= 0 else None for code in key.tolist()])
+                for key in keys
+            ], dtype=bool)
+            positions = candidates[matched[inverse.reshape(-1)]].astype(np.int32) if len(keys) else EMPTY_POSTINGS
+            self.positions.append(positions)
+            if not len(positions):
+                logger.warning(f"Major change {change.get('ref')} ({change.get('category')}) matches no factors")
+                continue
+            # A factor listed under several entries takes the first one's change
+            unassigned = positions[self.entry[positions] < 0]
+            self.entry[unassigned] = number
+            self.low[unassigned], self.high[unassigned] = change_bounds(change)
+
+    @staticmethod
+    def _matches(change: Dict[str, Any], category: str, values: List[Optional[str]]) -> bool:
+        """Whether a factor with `values` for MAJOR_CHANGE_COLUMNS falls under a change in its category."""
+        level2, level3, level4, column_text, activity_unit, emission_unit = values
+        subcategory = _normalize_name(change.get("subcategory"))
+        if subcategory not in ("", "all factors", category):
+            names = [_normalize_name(name) for name in (level2, level3, level4, column_text)]
+            for term in _SUBCATEGORY_SEPARATOR.split(change["subcategory"].strip()):
+                term = _normalize_name(term)
+                term = MAJOR_CHANGE_ALIASES.get(term, term)
+                if not any(term in name for name in names if name):
+                    return False
+        
+        gases = {_normalize_name(gas) for gas in _LIST_SEPARATOR.split(change.get("ghg_unit") or "") if gas}
+        if gases:
+            unit = parse_unit(emission_unit)
+            if unit is None:
+                return False
+            gas = _GAS_PATTERN.search(unit.qualifier)
+            if (gas.group(1) if gas else unit.qualifier) not in gases:
+                return False
+        
+        units = {_normalize_name(unit) for unit in _LIST_SEPARATOR.split(change.get("unit") or "") if unit}
+        if units and "all" not in units:
+            return _normalize_name(activity_unit) in units
+        return True
+
+    def factor_ids(self, table: FactorTable) -> List[List[str]]:
+        """IDs of the factors each entry affects."""
+        return [[table.ids[p] for p in positions.tolist()] for positions in self.positions]
+
+def _impact_range(emissions: np.ndarray, low: np.ndarray, high: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Change in emissions since the previous year at each change bound.
+    
+    A factor that changed by p% was current / (1 + p/100) before, so the change
+    in emissions is current * p / (100 + p).
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        at_low = np.nan_to_num(emissions * low / (100 + low), nan=0.0, posinf=0.0, neginf=0.0)
+        at_high = np.nan_to_num(emissions * high / (100 + high), nan=0.0, posinf=0.0, neginf=0.0)
+    return at_low, at_high
+
+def major_change_impact(index: FactorIndex, changes: MajorChangeIndex, factor_ids: List[str],
+                        rows: List[ActivityRow], emission_unit: str = "kg CO2e") -> Dict[str, Any]:
+    """Year-over-year footprint impact of the major changes on a client's factors and activity.
+    
+    `factor_ids` are reported with the change that affects each of them; `rows`
+    are resolved as by /calculate and their emissions split into the previous
+    year's value and the change at the lower and upper change bounds, totalled
+    per major change with bincount.
+    """
+    count = len(changes.changes)
+    
+    # Factors in use: which change affects each
+    id_positions = np.fromiter(
+        (index.position_by_id.get(factor_id, -1) for factor_id in factor_ids), dtype=np.int64, count=len(factor_ids)
+    )
+    found = id_positions >= 0
+    id_entries = np.full(len(factor_ids), -1, dtype=np.int64)
+    id_entries[found] = changes.entry[id_positions[found]]
+    affected_factors = [
+        {"factor_id": factor_ids[i], "ref": changes.changes[entry].get("ref")}
+        for i, entry in enumerate(id_entries.tolist()) if entry >= 0
+    ]
+    factors_by_change = np.bincount(id_entries[id_entries >= 0], minlength=count)
+    
+    # Activity: emissions gathered as in /calculate, split by the change affecting each row
+    positions, multipliers, errors = resolve_activity_rows(index, rows, emission_unit)
+    emissions = activity_emissions(index, rows, positions, multipliers, errors)
+    resolved = positions >= 0
+    resolved_positions = positions[resolved]
+    emissions = emissions[resolved]
+    entries = changes.entry[resolved_positions]
+    affected = entries >= 0
+    impact_low, impact_high = _impact_range(
+        emissions[affected], changes.low[resolved_positions[affected]], changes.high[resolved_positions[affected]]
+    )
+    emissions_by_change = np.bincount(entries[affected], weights=emissions[affected], minlength=count)
+    rows_by_change = np.bincount(entries[affected], minlength=count)
+    low_by_change = np.bincount(entries[affected], weights=impact_low, minlength=count)
+    high_by_change = np.bincount(entries[affected], weights=impact_high, minlength=count)
+    
+    with np.errstate(over="ignore", invalid="ignore"):
+        total = float(emissions.sum())
+        impact = (float(low_by_change.sum()), float(high_by_change.sum()))
+        previous = np.array([total - impact[0], total - impact[1]])
+    require_finite_totals(total, np.array(impact), previous, emissions_by_change, low_by_change, high_by_change)
+    
+    def percentage(change: float, current: float) -> Optional[float]:
+        previous = current - change
+        return round(change / previous * 100, 4) if previous else None
+    
+    by_change = []
+    for number, change in enumerate(changes.changes):
+        if not (factors_by_change[number] or rows_by_change[number]):
+            continue
+        current = float(emissions_by_change[number])
+        by_change.append({
+            "ref": change.get("ref"),
+            "category": change.get("category"),
+            "subcategory": change.get("subcategory"),
+            "change_percentage_range": list(change_bounds(change)),
+            "factors_used": int(factors_by_change[number]),
+            "rows": int(rows_by_change[number]),
+            "kg_co2e": current,
+            "impact_kg_co2e_range": [float(low_by_change[number]), float(high_by_change[number])]
+        })
+    
+    return {
+        "factors": {
+            "requested": len(factor_ids),
+            "affected": affected_factors,
+            "missing": [factor_ids[i] for i in np.flatnonzero(~found).tolist()]
+        },
+        "rows_calculated": int(resolved.sum()),
+        "rows_failed": len(errors),
+        "errors": [{"index": i, "error": error} for i, error in errors.items()],
+        "total_kg_co2e": total,
+        "affected_kg_co2e": float(emissions[affected].sum()),
+        "previous_kg_co2e_range": previous.tolist(),
+        "impact_kg_co2e_range": list(impact),
+        "impact_percentage_range": [percentage(impact[0], total), percentage(impact[1], total)],
+        "by_change": by_change
+    }
+
+# Serialization
+def dumps(obj: Any) -> bytes:
+    """Serialize to compact JSON bytes, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode('utf-8')
+
+def encode_factor(factor: Dict) -> bytes:
+    """Encode a factor with the fields, order and types the ConversionFactor model produces."""
+    return dumps({
+        "id": factor["id"],
+        "scope": factor.get("scope"),
+        "category": factor.get("category", {}),
+        "units": factor.get("units", {}),
+        "conversion_factor": float(factor.get("conversion_factor", 0)),
+        "column_text": factor.get("column_text"),
+        "year": int(factor["year"]),
+        "tags": factor.get("tags", []),
+        "provenance": factor.get("provenance")
+    })
+
+def join_factors(fragments: Iterable[bytes]) -> bytes:
+    """JSON array of pre-encoded factors."""
+    return b"[" + b",".join(fragments) + b"]"
+
+# Multi-year store
+class FactorDataset:
+    """One loaded and fully indexed version of a year's conversion factors.
+    
+    Datasets are never modified after construction; a reload builds a new one
+    and swaps it in, so a request that holds a dataset sees a consistent
+    snapshot for its whole lifetime.
+    """
+
+    def __init__(self, year: int, data: Dict[str, Any], version: int, fingerprint: Tuple,
+                 read_seconds: float = 0.0):
+        start = time.perf_counter()
+        self.year = year
+        self.data = data
+        self.version = version
+        self.fingerprint = fingerprint
+        # Seconds spent in each build phase, logged at startup
+        self.build_seconds: Dict[str, float] = {"read": read_seconds}
+        
+        def timed(phase: str, build: Callable[[], Any]) -> Any:
+            phase_start = time.perf_counter()
+            result = build()
+            self.build_seconds[phase] = time.perf_counter() - phase_start
+            return result
+        
+        table = data["table"]
+        self.index = timed("index", lambda: FactorIndex(table))
+        self.ranked = timed("ranked_index", lambda: RankedSearchIndex(table))
+        self.category_tree = timed("category_tree", lambda: CategoryTree(table, self.index))
+        self.quick_lookups = timed(
+            "quick_lookups", lambda: QuickLookupTables(table, self.index, load_quick_lookup_config())
+        )
+        # The major changes document describes one year's publication
+        self.major_changes_document = load_major_changes()
+        changes = self.major_changes_document
+        self.major_changes = timed("major_changes", lambda: MajorChangeIndex(
+            table, changes["major_changes"] if changes["metadata"].get("year") == year else []
+        ))
+        # JSON fragments, encoded once and joined into responses
+        self.encoded_metadata = dumps(data["metadata"])
+        self.encoded_factors = timed(
+            "encode_factors", lambda: [encode_factor(table.record(position)) for position in range(len(table))]
+        )
+        # Reported in /health; the table is immutable, so measured once
+        self.table_bytes = table.nbytes()
+        self.loaded_at = datetime.now(timezone.utc)
+        # Reading the data file plus building the indexes above
+        self.load_seconds = read_seconds + time.perf_counter() - start
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        return self.data["metadata"]
+
+    @property
+    def factors(self) -> FactorTable:
+        return self.data["table"]
+
+    def describe(self) -> Dict[str, Any]:
+        """Version information reported by /health and /metadata."""
+        return {
+            "year": self.year,
+            "version": self.version,
+            # Content hash written by the parser; equal across reloads of unchanged data
+            "dataset_version": self.metadata.get("dataset_version"),
+            "loaded_at": self.loaded_at.isoformat(),
+            "load_seconds": round(self.load_seconds, 3),
+            "total_factors": len(self.factors)
+        }
+
+class FactorStore:
+    """Year-partitioned conversion factor datasets with hot reload.
+    
+    Each year is loaded and indexed on first use. `reload` builds replacement
+    datasets in a background thread and swaps each in with a single assignment
+    under a new version number; `start_watching` polls the data files and
+    reloads a year when its files change. Year-over-year diffs are computed once
+    per pair of dataset versions.
+    """
+
+    def __init__(self, data_dir: Path = DATA_DIR):
+        self.data_dir = data_dir
+        self._datasets: Dict[int, FactorDataset] = {}
+        self._diffs: Dict[Tuple[int, int], Tuple[Tuple[int, int], Dict[str, Any]]] = {}
+        self._next_version = 1
+        self._lock = threading.RLock()
+        self._reload_lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watching = threading.Event()
+
+    def available_years(self) -> List[int]:
+        """Years with a JSON export or binary snapshot in the data directory."""
+        years = set(self._datasets)
+        for path in self.data_dir.glob("conversion_factors_*"):
+            suffix = path.stem.rsplit("_", 1)[-1]
+            if path.suffix in (".json", ".bin") and suffix.isdigit():
+                years.add(int(suffix))
+        return sorted(years)
+
+    def has_year(self, year: int) -> bool:
+        """Whether data for a year is loaded or available on disk."""
+        return year in self._datasets or any(
+            (self.data_dir / f"conversion_factors_{year}{suffix}").exists() for suffix in (".json", ".bin")
+        )
+
+    def loaded_years(self) -> List[int]:
+        return sorted(self._datasets)
+
+    def is_loaded(self, year: int) -> bool:
+        return year in self._datasets
+
+    def fingerprint(self, year: int) -> Tuple:
+        """Modification time and size of a year's data files, used to detect changes."""
+        fingerprint = []
+        for suffix in (".json", ".bin"):
+            path = self.data_dir / f"conversion_factors_{year}{suffix}"
+            try:
+                stat = path.stat()
+                fingerprint.append((suffix, stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                fingerprint.append((suffix, None, None))
+        return tuple(fingerprint)
+
+    def _build(self, year: int) -> FactorDataset:
+        fingerprint = self.fingerprint(year)
+        start = time.perf_counter()
+        data = read_conversion_factors(year, self.data_dir)
+        read_seconds = time.perf_counter() - start
+        with self._lock:
+            version = self._next_version
+            self._next_version += 1
+        dataset = FactorDataset(year, data, version, fingerprint, read_seconds)
+        logger.info(f"Indexed {len(dataset.factors)} {year} conversion factors as version {version}")
+        return dataset
+
+    def get(self, year: int) -> FactorDataset:
+        """Return the active dataset for a year, loading it on first use."""
+        dataset = self._datasets.get(year)
+        if dataset is None:
+            with self._lock:
+                dataset = self._datasets.get(year)
+                if dataset is None:
+                    dataset = self._datasets[year] = self._build(year)
+        return dataset
+
+    def reload(self, years: Optional[List[int]] = None, background: bool = True) -> bool:
+        """Rebuild datasets (default: every loaded year) and swap them in.
+        
+        Returns False without doing anything if a reload is already running.
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            return False
+        years = list(years) if years is not None else self.loaded_years()
+        
+        def run() -> None:
+            try:
+                for year in years:
+                    try:
+                        dataset = self._build(year)
+                    except Exception as e:
+                        logger.error(f"Reload of {year} conversion factors failed, keeping the active version: {e}")
+                        continue
+                    # Atomic swap; requests holding the previous dataset keep using it
+                    self._datasets[year] = dataset
+                    logger.info(f"Activated {year} conversion factors version {dataset.version}")
+            finally:
+                self._reload_lock.release()
+        
+        if background:
+            threading.Thread(target=run, name="factor-reload", daemon=True).start()
+        else:
+            run()
+        return True
+
+    def start_watching(self, interval: float = 5.0) -> None:
+        """Poll the data files of loaded years and reload any that change.
+        
+        A change is acted on once the files have been stable for one interval,
+        so a reload never reads a file the parser is still writing.
+        """
+        if self._watcher is not None:
+            return
+        self._stop_watching.clear()
+        
+        def watch() -> None:
+            pending: Dict[int, Tuple] = {}
+            failed: Dict[int, Tuple] = {}
+            while not self._stop_watching.wait(interval):
+                for year, dataset in list(self._datasets.items()):
+                    fingerprint = self.fingerprint(year)
+                    if fingerprint in (dataset.fingerprint, failed.get(year)):
+                        pending.pop(year, None)
+                    elif pending.get(year) == fingerprint:
+                        logger.info(f"{year} conversion factor files changed, reloading")
+                        pending.pop(year)
+                        if self.reload([year], background=False) and self._datasets.get(year) is dataset:
+                            # Failed; don't retry until the files change again
+                            failed[year] = fingerprint
+                    else:
+                        pending[year] = fingerprint
+        
+        self._watcher = threading.Thread(target=watch, name="factor-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self) -> None:
+        self._stop_watching.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def has_diff(self, from_year: int, to_year: int) -> bool:
+        """Whether the diff between the active versions of two years is already computed."""
+        old, new = self._datasets.get(from_year), self._datasets.get(to_year)
+        cached = self._diffs.get((from_year, to_year))
+        return old is not None and new is not None and cached is not None and cached[0] == (old.version, new.version)
+
+    def diff(self, from_year: int, to_year: int) -> Dict[str, Any]:
+        """Return the cached diff between two years, computing it on first use."""
+        old, new = self.get(from_year), self.get(to_year)
+        versions = (old.version, new.version)
+        cached = self._diffs.get((from_year, to_year))
+        if cached is None or cached[0] != versions:
+            with self._lock:
+                cached = self._diffs.get((from_year, to_year))
+                if cached is None or cached[0] != versions:
+                    diff = {"from_year": from_year, "to_year": to_year, **diff_factors(old.factors, new.factors)}
+                    cached = self._diffs[(from_year, to_year)] = (versions, diff)
+                    logger.info(f"Computed {from_year}->{to_year} diff: {diff['summary']}")
+        return cached[1]
+
+factor_store = FactorStore()
+
+def get_dataset(year: int = DEFAULT_YEAR) -> FactorDataset:
+    """Get the active dataset for a year (cached by the factor store)."""
+    with timed_phase("load"):
+        return factor_store.get(year)
+
+def require_year(year: int) -> int:
+    """Raise a 404 unless conversion factors are available for the year."""
+    if not factor_store.has_year(year):
+        raise HTTPException(
+            status_code=404,
+            detail=f"No conversion factors available for {year}; available years: {factor_store.available_years()}"
+        )
+    return year
+
+def require_unit(unit: Optional[str]) -> Optional[Unit]:
+    """Raise a 400 unless the unit (when given) is one the unit registry knows."""
+    if not unit:
+        return None
+    parsed = parse_unit(unit)
+    if parsed is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown unit '{unit}'; supported units: {', '.join(sorted(UNIT_SCALES))}"
+        )
+    return parsed
+
+# Response cache
+RESPONSE_CACHE_MAX_ENTRIES = 2048
+RESPONSE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+RESPONSE_CACHE_TTL_SECONDS = 3600
+
+class ResponseCache:
+    """LRU cache of serialized JSON response bodies.
+    
+    Entries are evicted least recently used first once either the entry or the
+    byte budget is exceeded, and expire after a TTL. Keys include the dataset
+    version, so entries for a replaced dataset are never served.
+    """
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+                 max_bytes: int = RESPONSE_CACHE_MAX_BYTES, ttl_seconds: float = RESPONSE_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple, Tuple[float, bytes]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Tuple) -> Optional[bytes]:
+        """Return a cached body, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] > self.ttl_seconds:
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Tuple, body: bytes) -> None:
+        """Store a body, evicting least recently used entries over budget."""
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic(), body)
+            self._bytes += len(body)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key: Tuple) -> None:
+        _, body = self._entries.pop(key)
+        self._bytes -= len(body)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds
+        }
+
+response_cache = ResponseCache()
+
+# Parameters whose value appears in the response as given, so they keep their case in cache keys;
+# `unit` is the activity unit label of rescaled factors
+CASE_SENSITIVE_CACHE_PARAMS = {"unit"}
+
+def cache_key(endpoint: str, dataset: FactorDataset, **params: Any) -> Tuple:
+    """Normalized cache key: string parameters lowercased, parameters sorted by name.
+    
+    Every filter matches case-insensitively, so differently cased queries share
+    an entry, except for CASE_SENSITIVE_CACHE_PARAMS. Callers pass all
+    parameters, defaults included.
+    """
+    normalized = tuple(sorted(
+        (name, value.lower() if isinstance(value, str) and name not in CASE_SENSITIVE_CACHE_PARAMS else value)
+        for name, value in params.items()
+    ))
+    return (endpoint, dataset.year, dataset.version, normalized)
+
+async def cached_json_response(key: Tuple, build: Callable[[], bytes], cost: int = 0) -> Response:
+    """Serve a cached JSON body, building and caching it on a miss.
+    
+    `cost` is the build's estimated cost for the query executor.
+    """
+    body = response_cache.get(key)
+    cache_status = "HIT"
+    if body is None:
+        cache_status = "MISS"
+        body = await query_executor.run(cost, build)
+        response_cache.put(key, body)
+    return Response(content=body, media_type="application/json", headers={"X-Cache": cache_status})
+
+# Request metrics
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+RESULT_SIZE_BUCKETS = (0, 1, 10, 50, 100, 500, 1000, 5000, 10000, 50000, 100000, 1000000)
+
+PROCESS_STARTED = time.monotonic()
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        name + '="' + str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for name, value in labels
+    )
+    return "{" + ",".join(escaped) + "}"
+
+class Histogram:
+    """Cumulative-bucket histogram per label set, rendered in Prometheus text format."""
+
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        # labels -> [bucket counts..., +Inf count, sum]
+        self._series: Dict[Tuple[Tuple[str, str], ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series_items = [(key, list(series)) for key, series in sorted(self._series.items())]
+        for key, series in series_items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f"{self.name}_bucket{_format_labels(key + (('le', le),))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {series[-1]}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {cumulative}")
+        return lines
+
+class Counter:
+    """Monotonic counter per label set, rendered in Prometheus text format."""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._values: Dict[Tuple[Tuple[str, str], ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            lines.extend(f"{self.name}{_format_labels(key)} {value}" for key, value in sorted(self._values.items()))
+        return lines
+
+request_duration = Histogram(
+    "cf_api_request_duration_seconds", "Request latency by route.", LATENCY_BUCKETS
+)
+phase_duration = Histogram(
+    "cf_api_phase_duration_seconds", "Time spent in each request phase (load, queue, filter, paginate, serialize, calculate).",
+    LATENCY_BUCKETS
+)
+result_size = Histogram(
+    "cf_api_result_size", "Number of factors matched per request.", RESULT_SIZE_BUCKETS
+)
+cache_requests = Counter(
+    "cf_api_cache_requests_total", "Response cache lookups by route and result."
+)
+
+# Phase timings of the request being handled; a dict shared with the tasks and threads it spawns
+_request_metrics: ContextVar[Optional[Dict[str, Any]]] = ContextVar("request_metrics", default=None)
+
+@contextmanager
+def timed_phase(name: str) -> Iterator[None]:
+    """Add the time spent in the block to a phase of the current request."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        current = _request_metrics.get()
+        if current is not None:
+            phases = current["phases"]
+            phases[name] = phases.get(name, 0.0) + time.perf_counter() - start
+
+def record_result_size(rows: int) -> None:
+    """Record how many factors the current request matched."""
+    current = _request_metrics.get()
+    if current is not None:
+        current["result_size"] = rows
+
+def process_memory_bytes() -> Dict[str, int]:
+    """Resident and peak resident memory of the API process."""
+    peak = 0
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak *= 1 if sys.platform == "darwin" else 1024
+    try:
+        with open("/proc/self/statm", "r") as f:
+            resident = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        resident = peak
+    return {"resident": resident, "peak_resident": peak}
+
+def render_metrics() -> str:
+    """All metrics in Prometheus text exposition format."""
+    lines: List[str] = []
+    for metric in (request_duration, phase_duration, result_size, cache_requests, query_executions):
+        lines.extend(metric.render())
+    
+    cache = response_cache.stats()
+    pool = query_executor.stats()
+    memory = process_memory_bytes()
+    gauges = [
+        ("cf_api_uptime_seconds", "Seconds since the API process started.", [((), time.monotonic() - PROCESS_STARTED)]),
+        ("cf_api_process_resident_memory_bytes", "Resident memory of the API process.", [((), memory["resident"])]),
+        ("cf_api_response_cache_entries", "Entries in the response cache.", [((), cache["entries"])]),
+        ("cf_api_response_cache_bytes", "Bytes held by the response cache.", [((), cache["bytes"])]),
+        ("cf_api_query_pool_running", "Queries running on the query pool.", [((), pool["running"])]),
+        ("cf_api_query_pool_queued", "Queries waiting for the query pool.", [((), pool["queued"])]),
+    ]
+    datasets = [factor_store.get(year) for year in factor_store.loaded_years()]
+    gauges += [
+        ("cf_api_dataset_factors", "Conversion factors in each loaded dataset.",
+         [((("year", str(d.year)),), len(d.factors)) for d in datasets]),
+        ("cf_api_dataset_load_seconds", "Seconds taken to read and index each loaded dataset.",
+         [((("year", str(d.year)),), d.load_seconds) for d in datasets]),
+        ("cf_api_dataset_version", "Version of each loaded dataset.",
+         [((("year", str(d.year)),), d.version) for d in datasets]),
+    ]
+    for name, help_text, samples in gauges:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        lines.extend(f"{name}{_format_labels(labels)} {value}" for labels, value in samples)
+    return "\n".join(lines) + "\n"
+
+class RequestMetricsMiddleware:
+    """ASGI middleware recording latency, phase timings, result sizes and cache results per route.
+    
+    Routes are labelled by their path template, so /factors/{factor_id} is one series.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        current: Dict[str, Any] = {"phases": {}, "result_size": None}
+        response_start: Dict[str, Any] = {}
+        
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                response_start.update(message)
+            await send(message)
+        
+        token = _request_metrics.set(current)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_metrics.reset(token)
+            elapsed = time.perf_counter() - start
+            route = scope.get("route")
+            path = route.path if route is not None else "unmatched"
+            status = str(response_start.get("status", 500))
+            
+            request_duration.observe(elapsed, method=scope["method"], route=path, status=status)
+            for phase, seconds in current["phases"].items():
+                phase_duration.observe(seconds, route=path, phase=phase)
+            if current["result_size"] is not None:
+                result_size.observe(current["result_size"], route=path)
+            for name, value in response_start.get("headers", []):
+                if name == b"x-cache":
+                    cache_requests.inc(route=path, result=value.decode("latin-1").lower())
+
+app.add_middleware(RequestMetricsMiddleware)
+
+# Query execution
+# Estimated cost of a request, in factor rows it may touch; above this it leaves the event loop
+QUERY_INLINE_MAX_ROWS = 20000
+QUERY_WORKERS = max(2, min(4, os.cpu_count() or 1))
+QUERY_MAX_QUEUED = 64
+# Cost of loading and indexing a dataset that is not loaded yet: always offloaded
+DATASET_LOAD_COST = sys.maxsize
+
+query_executions = Counter(
+    "cf_api_query_executions_total", "Request work run inline, offloaded to the query pool, or rejected as overloaded."
+)
+
+class QueryExecutor:
+    """Runs request work inline or on a thread pool, by estimated cost.
+    
+    Work estimated at up to `inline_max_rows` factor rows runs inline on the
+    event loop, where a thread hop would cost more than the work. Heavier work
+    runs on the pool so the event loop keeps serving cheap requests, such as
+    /health and /factors/{id}, while it runs; the pool threads read the same
+    immutable datasets, and numpy releases the GIL in the filter, gather and
+    reduce steps. At most `max_workers` jobs run and `max_queued` wait; beyond
+    that the request is rejected with a 503 and a Retry-After estimated from
+    the queue length and recent job durations. The pool is created on first
+    use, so the executor can be shut down and used again by a restarted app.
+    """
+
+    def __init__(self, max_workers: int = QUERY_WORKERS, max_queued: int = QUERY_MAX_QUEUED,
+                 inline_max_rows: int = QUERY_INLINE_MAX_ROWS):
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.inline_max_rows = inline_max_rows
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._admitted = 0
+        # Moving average of offloaded job durations, for Retry-After
+        self._mean_seconds = 0.05
+
+    async def run(self, cost: int, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run `fn(*args)` inline or on the pool and return its result."""
+        if cost <= self.inline_max_rows:
+            query_executions.inc(mode="inline")
+            return fn(*args)
+        
+        with self._lock:
+            if self._admitted >= self.max_workers + self.max_queued:
+                retry_after = self.retry_after()
+                query_executions.inc(mode="rejected")
+                raise HTTPException(
+                    status_code=503,
+                    detail="Too many expensive queries in progress; retry shortly",
+                    headers={"Retry-After": str(retry_after)}
+                )
+            self._admitted += 1
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="cf-query")
+            pool = self._pool
+        query_executions.inc(mode="offloaded")
+        
+        submitted = time.perf_counter()
+        
+        def job() -> Any:
+            started = time.perf_counter()
+            current = _request_metrics.get()
+            if current is not None:
+                current["phases"]["queue"] = current["phases"].get("queue", 0.0) + started - submitted
+            try:
+                return fn(*args)
+            finally:
+                elapsed = time.perf_counter() - started
+                with self._lock:
+                    self._mean_seconds += 0.1 * (elapsed - self._mean_seconds)
+        
+        def release(_: Optional[Future]) -> None:
+            with self._lock:
+                self._admitted -= 1
+        
+        # Copy the context so phase timings land in this request's metrics
+        context = contextvars.copy_context()
+        try:
+            future = pool.submit(context.run, job)
+        except BaseException:
+            release(None)
+            raise
+        # The job holds its admission until it finishes or is cancelled, not until the request gives up
+        future.add_done_callback(release)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # Client went away: drop the job if it has not started yet
+            future.cancel()
+            raise
+
+    def retry_after(self) -> int:
+        """Seconds until a queued job would likely start."""
+        queued = max(0, self._admitted - self.max_workers)
+        return max(1, math.ceil((queued + 1) * self._mean_seconds / self.max_workers))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            admitted = self._admitted
+        return {
+            "workers": self.max_workers,
+            "running": min(admitted, self.max_workers),
+            "queued": max(0, admitted - self.max_workers),
+            "max_queued": self.max_queued,
+            "inline_max_rows": self.inline_max_rows,
+            "mean_job_seconds": round(self._mean_seconds, 6)
+        }
+
+    def shutdown(self) -> None:
+        """Stop the pool's threads; the next offloaded job starts a new pool."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+query_executor = QueryExecutor()
+
+async def fetch_dataset(year: int = DEFAULT_YEAR) -> FactorDataset:
+    """Get the active dataset for a year, loading it off the event loop on first use."""
+    if factor_store.is_loaded(year):
+        return get_dataset(year)
+    return await query_executor.run(DATASET_LOAD_COST, get_dataset, year)
+
+# Helper functions
+def search_factors(factors: FactorTable, search_params: SearchRequest,
+                   index: Optional[FactorIndex] = None) -> List[FactorRow]:
+    """Search and filter conversion factors based on parameters.
+    
+    When an index built over `factors` is given the request is answered from its
+    posting lists; otherwise every filter is evaluated as a row mask over the
+    table's columns.
+    """
+    if index is not None:
+        return index.search(search_params)
+    
+    mask = np.ones(len(factors), dtype=bool)
+    
+    # Filter by scope, category levels and units
+    column_filters = [
+        ("scope", search_params.scope),
+        ("category.level1", search_params.category_level1),
+        ("category.level2", search_params.category_level2),
+        ("category.level3", search_params.category_level3),
+        ("units.activity_unit", search_params.activity_unit),
+        ("units.emission_unit", search_params.emission_unit)
+    ]
+    for column, term in column_filters:
+        if term:
+            mask &= factors.contains(column, term)
     
     # Free text search
     if search_params.search_term:
-        search_term = search_params.search_term.lower()
-        filtered_factors = [
-            f for f in filtered_factors 
-            if any(search_term in tag.lower() for tag in f.get('tags', [])) or
-               any(search_term in str(v).lower() for v in f.get('category', {}).values() if v)
-        ]
+        text_matches = factors.contains("tags", search_params.search_term)
+        for level in CATEGORY_LEVELS:
+            text_matches |= factors.contains(f"category.{level}", search_params.search_term)
+        mask &= text_matches
+    
+    # Filter by compatible unit; the range then applies to the rescaled values
+    values = factors.values
+    if search_params.unit:
+        unit = parse_unit(search_params.unit)
+        compatible = np.zeros(len(factors), dtype=bool)
+        if unit is not None:
+            units = UnitColumn(factors, "units.activity_unit")
+            compatible[units.compatible(unit)] = True
+            values = values * units.multipliers(unit, np.arange(len(factors)))
+        mask &= compatible
     
     # Filter by factor range
     if search_params.min_factor is not None:
-        filtered_factors = [
-            f for f in filtered_factors 
-            if f.get('conversion_factor', 0) >= search_params.min_factor
-        ]
-    
+        mask &= values >= search_params.min_factor
     if search_params.max_factor is not None:
-        filtered_factors = [
-            f for f in filtered_factors 
-            if f.get('conversion_factor', 0) <= search_params.max_factor
-        ]
+        mask &= values <= search_params.max_factor
+    
+    return [factors[position] for position in np.flatnonzero(mask).tolist()]
+
+def build_search_response(dataset: FactorDataset, search_params: SearchRequest, page: int, per_page: int) -> bytes:
+    """Filter and paginate factors for /factors and /search.
+    
+    The body is a serialized ConversionFactorResponse assembled from the
+    dataset's pre-encoded fragments; with a unit, only the page's factors are
+    rescaled and encoded per request. Facets count the whole match set.
+    """
     
-    return filtered_factors
+    # Filter factors
+    with timed_phase("filter"):
+        positions = dataset.index.search_positions(search_params)
+    record_result_size(len(positions))
+    
+    # Pagination
+    with timed_phase("paginate"):
+        start_idx = (page - 1) * per_page
+        end_idx = start_idx + per_page
+        page_positions = positions[start_idx:end_idx].tolist()
+    
+    with timed_phase("facets"):
+        facets = dataset.index.facets.counts(positions)
+    
+    with timed_phase("serialize"):
+        if search_params.unit:
+            unit = parse_unit(search_params.unit)
+            fragments = [encode_factor(record) for record in dataset.index.rescaled_records(page_positions, unit)]
+        else:
+            encoded_factors = dataset.encoded_factors
+            fragments = [encoded_factors[p] for p in page_positions]
+        return b"".join([
+            b'{"metadata":', dataset.encoded_metadata,
+            b',"factors":', join_factors(fragments),
+            b',"total":', dumps(len(positions)),
+            b',"page":', dumps(page),
+            b',"per_page":', dumps(per_page),
+            b',"facets":', dumps(facets),
+            b"}"
+        ])
+
+def search_cost(dataset: FactorDataset, search_params: SearchRequest, page_size: int) -> int:
+    """Estimated cost of a search: the posting entries its filters read, plus one page of results."""
+    return dataset.index.search_cost(search_params) + page_size
+
+# Pre-serialized responses
+def build_metadata_response(dataset: FactorDataset) -> bytes:
+    return dumps({
+        "conversion_factors": dataset.metadata,
+        "major_changes": dataset.major_changes_document["metadata"],
+        "dataset": dataset.describe()
+    })
+
+def build_categories_response(dataset: FactorDataset) -> bytes:
+    return dumps({"categories": dataset.metadata["categories"], "scopes": dataset.metadata["scopes"]})
+
+def build_major_changes_response(dataset: FactorDataset, include_factors: bool = False) -> bytes:
+    changes = dataset.major_changes_document
+    if include_factors:
+        # The join is empty when the document describes another year
+        factor_ids = dataset.major_changes.factor_ids(dataset.factors)
+        changes = {**changes, "major_changes": [
+            {**change, "factor_ids": factor_ids[i] if i < len(factor_ids) else []}
+            for i, change in enumerate(changes["major_changes"])
+        ]}
+    return dumps(changes)
+
+# Bodies primed into the response cache at startup, by cache key endpoint name
+PRESERIALIZED_RESPONSES: Dict[str, Callable[[FactorDataset], bytes]] = {
+    "metadata": build_metadata_response,
+    "categories": build_categories_response,
+    "major-changes": build_major_changes_response
+}
+
+# Startup warm-up
+DATA_WATCH_INTERVAL_SECONDS = 5.0
+
+startup_state: Dict[str, Any] = {"ready": False, "error": None, "phases": {}}
+
+def warm_up_years() -> List[int]:
+    """Years to load before serving: CONVERSION_FACTORS_WARM_UP_YEARS (comma-separated), else the default year."""
+    configured = os.environ.get("CONVERSION_FACTORS_WARM_UP_YEARS")
+    if not configured:
+        return [DEFAULT_YEAR]
+    return [int(year) for year in configured.split(",") if year.strip()]
+
+def warm_up() -> None:
+    """Load and index datasets and pre-serialize common responses before serving.
+    
+    Each phase is timed and logged. A failure is logged rather than raised, so
+    the worker still starts and loads on demand, but /ready stays 503.
+    """
+    start = time.perf_counter()
+    phases: Dict[str, float] = {}
+    try:
+        for year in warm_up_years():
+            dataset = get_dataset(year)
+            for phase, seconds in dataset.build_seconds.items():
+                phases[f"{year}.{phase}"] = seconds
+                logger.info(f"Startup phase {phase} ({year}): {seconds:.3f}s")
+        
+        phase_start = time.perf_counter()
+        dataset = get_dataset()
+        for name, build in PRESERIALIZED_RESPONSES.items():
+            response_cache.put(cache_key(name, dataset), build(dataset))
+        phases["preserialize"] = time.perf_counter() - phase_start
+        logger.info(f"Startup phase preserialize: {phases['preserialize']:.3f}s")
+    except Exception as e:
+        logger.error(f"Startup warm-up failed, loading on demand instead: {e}")
+        startup_state["error"] = str(e)
+    else:
+        startup_state["ready"] = True
+    
+    phases["total"] = time.perf_counter() - start
+    startup_state["phases"] = {phase: round(seconds, 3) for phase, seconds in phases.items()}
+    logger.info(f"Startup warm-up finished in {phases['total']:.3f}s")
 
 # API Endpoints
 
 @app.get("/", summary="API Health Check")
 async def root():
     """Health check endpoint."""
-    data = load_conversion_factors()
+    data = (await fetch_dataset()).data
     return {
         "status": "ok",
         "message": "UK Government GHG Conversion Factors API",
         "version": "1.0.0",
         "total_factors": data["metadata"]["total_factors"],
-        "year": data["metadata"]["year"]
+        "year": data["metadata"]["year"],
+        "available_years": factor_store.available_years()
     }
 
 @app.get("/metadata", summary="Get conversion factors metadata")
 async def get_metadata():
     """Get metadata about the conversion factors dataset."""
-    data = load_conversion_factors()
-    changes_data = load_major_changes()
-    
-    return {
-        "conversion_factors": data["metadata"],
-        "major_changes": changes_data["metadata"]
-    }
+    dataset = await fetch_dataset()
+    return await cached_json_response(cache_key("metadata", dataset), lambda: build_metadata_response(dataset))
 
 @app.get("/categories", summary="Get all categories")
 async def get_categories():
     """Get all available categories and their counts."""
-    data = load_conversion_factors()
-    return {
-        "categories": data["metadata"]["categories"],
-        "scopes": data["metadata"]["scopes"]
-    }
+    dataset = await fetch_dataset()
+    return await cached_json_response(cache_key("categories", dataset), lambda: build_categories_response(dataset))
+
+@app.get("/categories/tree", summary="Get the category hierarchy")
+async def get_category_tree(
+    path: List[str] = Query([], description="Category names from level 1 down, one parameter per level"),
+    depth: int = Query(1, ge=0, le=len(CATEGORY_LEVELS), description="Levels of children to include"),
+    year: int = Query(DEFAULT_YEAR, description="Conversion factor year")
+):
+    """Category hierarchy with counts, scope breakdown, units and factor statistics per node."""
+    
+    require_year(year)
+    
+    dataset = await fetch_dataset(year)
+    node = dataset.category_tree.find(path)
+    if node is None:
+        raise HTTPException(status_code=404, detail=f"Category path '{' > '.join(path)}' not found")
+    
+    key = cache_key("categories-tree", dataset, path=tuple(name.lower() for name in path), depth=depth)
+    return await cached_json_response(key, lambda: dumps(dataset.category_tree.to_dict(node, depth)))
 
 @app.get("/factors", response_model=ConversionFactorResponse, summary="Get conversion factors")
 async def get_conversion_factors(
     scope: Optional[str] = Query(None, description="Filter by scope"),
     category: Optional[str] = Query(None, description="Filter by category level 1"),
     search: Optional[str] = Query(None, description="Search term"),
+    unit: Optional[str] = Query(None, description="Report factors per this activity unit, e.g. MWh or miles"),
     page: int = Query(1, ge=1, description="Page number"),
-    per_page: int = Query(50, ge=1, le=1000, description="Items per page")
+    per_page: int = Query(50, ge=1, le=1000, description="Items per page"),
+    year: int = Query(DEFAULT_YEAR, description="Conversion factor year")
 ):
     """Get conversion factors with optional filtering and pagination."""
     
-    data = load_conversion_factors()
+    require_year(year)
+    require_unit(unit)
     
     # Create search parameters
     search_params = SearchRequest(
         scope=scope,
         category_level1=category,
-        search_term=search
+        search_term=search,
+        unit=unit
     )
     
-    # Filter factors
-    filtered_factors = search_factors(data["conversion_factors"], search_params)
-    
-    # Pagination
-    start_idx = (page - 1) * per_page
-    end_idx = start_idx + per_page
-    paginated_factors = filtered_factors[start_idx:end_idx]
-    
-    return ConversionFactorResponse(
-        metadata=data["metadata"],
-        factors=[ConversionFactor(**factor) for factor in paginated_factors],
-        total=len(filtered_factors),
-        page=page,
-        per_page=per_page
+    dataset = await fetch_dataset(year)
+    key = cache_key("search", dataset, page=page, per_page=per_page, **search_params.model_dump())
+    return await cached_json_response(
+        key, lambda: build_search_response(dataset, search_params, page, per_page),
+        search_cost(dataset, search_params, per_page)
     )
 
 @app.post("/search", response_model=ConversionFactorResponse, summary="Advanced search")
 async def search_conversion_factors(
     search_request: SearchRequest,
     page: int = Query(1, ge=1, description="Page number"),
-    per_page: int = Query(50, ge=1, le=1000, description="Items per page")
+    per_page: int = Query(50, ge=1, le=1000, description="Items per page"),
+    year: int = Query(DEFAULT_YEAR, description="Conversion factor year")
 ):
     """Advanced search for conversion factors with multiple criteria."""
     
-    data = load_conversion_factors()
+    require_year(year)
+    require_unit(search_request.unit)
     
-    # Filter factors
-    filtered_factors = search_factors(data["conversion_factors"], search_request)
+    dataset = await fetch_dataset(year)
+    key = cache_key("search", dataset, page=page, per_page=per_page, **search_request.model_dump())
+    return await cached_json_response(
+        key, lambda: build_search_response(dataset, search_request, page, per_page),
+        search_cost(dataset, search_request, per_page)
+    )
+
+@app.get("/search/ranked", summary="Ranked full-text search")
+async def ranked_search(
+    q: str = Query(..., min_length=1, description="Free-text query; misspellings are matched fuzzily"),
+    scope: Optional[str] = Query(None, description="Filter by scope"),
+    category: Optional[str] = Query(None, description="Filter by category level 1"),
+    limit: int = Query(20, ge=1, le=200, description="Number of results"),
+    fuzzy: bool = Query(True, description="Expand unknown terms to similarly spelled ones"),
+    year: int = Query(DEFAULT_YEAR, description="Conversion factor year")
+):
+    """Search factor tags with BM25 relevance ranking, best matches first."""
     
-    # Pagination
-    start_idx = (page - 1) * per_page
-    end_idx = start_idx + per_page
-    paginated_factors = filtered_factors[start_idx:end_idx]
-    
-    return ConversionFactorResponse(
-        metadata=data["metadata"],
-        factors=[ConversionFactor(**factor) for factor in paginated_factors],
-        total=len(filtered_factors),
-        page=page,
-        per_page=per_page
+    require_year(year)
+    
+    dataset = await fetch_dataset(year)
+    # Terms match case-insensitively; echoing the lowercased query keeps cached bodies independent of casing
+    q = q.lower()
+    key = cache_key("ranked", dataset, q=q, scope=scope, category=category, limit=limit, fuzzy=fuzzy)
+    filters = SearchRequest(scope=scope, category_level1=category)
+    cost = dataset.ranked.cost(q, fuzzy) + search_cost(dataset, filters, limit)
+    return await cached_json_response(
+        key, lambda: build_ranked_response(dataset, q, scope, category, limit, fuzzy), cost
+    )
+
+def build_ranked_response(dataset: FactorDataset, query: str, scope: Optional[str], category: Optional[str],
+                          limit: int, fuzzy: bool) -> bytes:
+    """Ranked search response body, with each factor's pre-encoded fragment."""
+    with timed_phase("filter"):
+        allowed = None
+        if scope or category:
+            filtered = dataset.index.search_positions(SearchRequest(scope=scope, category_level1=category))
+            allowed = set(filtered.tolist())
+        results, total, terms = dataset.ranked.search(query, limit, allowed, fuzzy)
+    record_result_size(total)
+    
+    with timed_phase("serialize"):
+        fragments = [
+            b'{"score":' + dumps(round(score, 4)) + b',"factor":' + dataset.encoded_factors[position] + b'}'
+            for position, score in results
+        ]
+        return (
+            b'{"query":' + dumps(query) + b',"terms":' + dumps(terms)
+            + b',"results":' + join_factors(fragments) + b',"total":' + dumps(total) + b'}'
+        )
+
+@app.get("/factors/export", summary="Export conversion factors")
+async def export_conversion_factors(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$", description="ndjson or csv"),
+    scope: Optional[str] = Query(None, description="Filter by scope"),
+    category: Optional[str] = Query(None, description="Filter by category level 1"),
+    search: Optional[str] = Query(None, description="Search term"),
+    activity_unit: Optional[str] = Query(None, description="Filter by activity unit"),
+    emission_unit: Optional[str] = Query(None, description="Filter by emission unit"),
+    year: int = Query(DEFAULT_YEAR, description="Conversion factor year")
+):
+    """Stream every matching conversion factor as NDJSON or CSV, without pagination."""
+    
+    require_year(year)
+    dataset = await fetch_dataset(year)
+    
+    search_params = SearchRequest(
+        scope=scope,
+        category_level1=category,
+        activity_unit=activity_unit,
+        emission_unit=emission_unit,
+        search_term=search
+    )
+    
+    def filter_factors() -> np.ndarray:
+        with timed_phase("filter"):
+            return dataset.index.search_positions(search_params)
+    
+    # The body itself is streamed from a threadpool by Starlette
+    positions = await query_executor.run(search_cost(dataset, search_params, 0), filter_factors)
+    record_result_size(len(positions))
+    
+    if export_format == "csv":
+        body, media_type = iter_csv(dataset.factors, positions), "text/csv"
+    else:
+        body, media_type = iter_ndjson(dataset.encoded_factors, positions), "application/x-ndjson"
+    
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="conversion_factors_{year}.{export_format}"',
+            "X-Total-Count": str(len(positions))
+        }
     )
 
+@app.post("/factors/batch", response_model=FactorBatchResponse, summary="Get factors by ID in bulk")
+async def get_factors_batch(
+    batch_request: FactorBatchRequest,
+    year: int = Query(DEFAULT_YEAR, description="Conversion factor year")
+):
+    """Resolve a list of conversion factor IDs in one call, listing any IDs not found."""
+    
+    require_year(year)
+    dataset = await fetch_dataset(year)
+    body = await query_executor.run(len(batch_request.ids), build_batch_response, dataset, batch_request.ids)
+    return Response(content=body, media_type="application/json")
+
+def build_batch_response(dataset: FactorDataset, ids: List[str]) -> bytes:
+    """Serialized FactorBatchResponse for a list of IDs."""
+    position_by_id = dataset.index.position_by_id
+    
+    fragments = []
+    missing = []
+    with timed_phase("filter"):
+        for factor_id in dict.fromkeys(ids):
+            position = position_by_id.get(factor_id)
+            if position is not None:
+                fragments.append(dataset.encoded_factors[position])
+            else:
+                missing.append(factor_id)
+    record_result_size(len(fragments))
+    
+    with timed_phase("serialize"):
+        return b"".join([
+            b'{"factors":', join_factors(fragments),
+            b',"missing":', dumps(missing),
+            b',"total":', dumps(len(fragments)),
+            b"}"
+        ])
+
 @app.get("/factors/{factor_id}", response_model=ConversionFactor, summary="Get specific factor")
-async def get_factor_by_id(factor_id: str):
+async def get_factor_by_id(
+    factor_id: str,
+    year: int = Query(DEFAULT_YEAR, description="Conversion factor year")
+):
     """Get a specific conversion factor by its ID."""
     
-    data = load_conversion_factors()
+    require_year(year)
+    dataset = await fetch_dataset(year)
+    position = dataset.index.position_by_id.get(factor_id)
+    
+    if position is None:
+        raise HTTPException(status_code=404, detail=f"Conversion factor {factor_id} not found for {year}")
+    
+    return Response(content=dataset.encoded_factors[position], media_type="application/json")
+
+@app.get("/diff", summary="Year-over-year factor changes")
+async def get_factor_diff(
+    from_year: int = Query(..., description="Earlier conversion factor year"),
+    to_year: int = Query(DEFAULT_YEAR, description="Later conversion factor year"),
+    scope: Optional[str] = Query(None, description="Filter by scope"),
+    category: Optional[str] = Query(None, description="Filter by category level 1"),
+    min_change: float = Query(0, ge=0, description="Minimum absolute percentage change"),
+    major_only: bool = Query(False, description="Only changes above the major change thresholds"),
+    page: int = Query(1, ge=1, description="Page number"),
+    per_page: int = Query(50, ge=1, le=1000, description="Items per page")
+):
+    """Compare factors between two years, largest percentage changes first."""
+    
+    require_year(from_year)
+    require_year(to_year)
+    old, new = await fetch_dataset(from_year), await fetch_dataset(to_year)
+    cost = 0 if factor_store.has_diff(from_year, to_year) else len(old.factors) + len(new.factors)
+    diff = await query_executor.run(cost, factor_store.diff, from_year, to_year)
+    
+    changes = diff["changes"]
+    if scope or category or min_change or major_only:
+        changes = [
+            c for c in changes
+            if (not scope or (c["scope"] and scope.lower() in c["scope"].lower()))
+            and (not category or (c["category"].get("level1") and category.lower() in c["category"]["level1"].lower()))
+            and (not min_change or c["change_percentage"] is None or abs(c["change_percentage"]) >= min_change)
+            and (not major_only or c["major"])
+        ]
+    
+    start_idx = (page - 1) * per_page
+    return {
+        "from_year": from_year,
+        "to_year": to_year,
+        "summary": diff["summary"],
+        "added": diff["added"],
+        "removed": diff["removed"],
+        "changes": changes[start_idx:start_idx + per_page],
+        "total": len(changes),
+        "page": page,
+        "per_page": per_page
+    }
+
+@app.post("/calculate", summary="Calculate emissions for activity data")
+async def calculate(
+    calculation_request: CalculationRequest,
+    year: int = Query(DEFAULT_YEAR, description="Conversion factor year"),
+    include_rows: bool = Query(True, description="Return per-row results as well as totals")
+):
+    """Calculate kg CO2e for a batch of activity rows, with totals by scope and category."""
+    
+    require_year(year)
+    dataset = await fetch_dataset(year)
+    
+    def run() -> JSONResponse:
+        with timed_phase("calculate"):
+            result = calculate_emissions(
+                dataset.index, calculation_request.rows, calculation_request.emission_unit, include_rows
+            )
+        record_result_size(len(calculation_request.rows))
+        
+        # Per-row results can run to hundreds of thousands of entries; skip jsonable_encoder
+        with timed_phase("serialize"):
+            return JSONResponse(content={"year": year, **result})
     
-    factor = next((f for f in data["conversion_factors"] if f["id"] == factor_id), None)
+    return await query_executor.run(len(calculation_request.rows), run)
+
+@app.get("/units", summary="Supported units and compatible-unit groups")
+async def get_units(year: int = Query(DEFAULT_YEAR, description="Conversion factor year")):
+    """Units accepted by `unit` parameters, and the year's factor units grouped by what they convert between."""
+    
+    require_year(year)
+    dataset = await fetch_dataset(year)
     
-    if not factor:
-        raise HTTPException(status_code=404, detail=f"Conversion factor {factor_id} not found")
+    def build() -> bytes:
+        supported: Dict[str, Dict[str, Any]] = {}
+        for name, (dimension, scale) in UNIT_SCALES.items():
+            group = supported.setdefault(dimension, {"base_unit": UNIT_BASES[dimension], "units": {}})
+            group["units"][name] = scale
+        units = {}
+        for column, unit_column in (("activity_units", dataset.index.activity_units),
+                                    ("emission_units", dataset.index.emission_units)):
+            units[column] = {"groups": unit_column.groups(), "unrecognised": unit_column.unrecognised}
+        return dumps({"supported": supported, **units})
     
-    return ConversionFactor(**factor)
+    return await cached_json_response(cache_key("units", dataset), build)
 
 @app.get("/major-changes", summary="Get 2025 major changes")
-async def get_major_changes():
+async def get_major_changes(
+    include_factors: bool = Query(False, description="List the IDs of the factors each change affects")
+):
     """Get analysis of major changes in 2025 conversion factors."""
-    return load_major_changes()
+    dataset = await fetch_dataset()
+    # The default body is primed at startup under the parameterless key
+    key = cache_key("major-changes", dataset, include_factors=True) if include_factors else cache_key(
+        "major-changes", dataset
+    )
+    return await cached_json_response(key, lambda: build_major_changes_response(dataset, include_factors))
+
+@app.post("/major-changes/impact", summary="Footprint impact of the 2025 major changes")
+async def get_major_change_impact(impact_request: ImpactRequest):
+    """Year-over-year impact of the major changes on the factors and activity totals a client uses."""
+    
+    if not impact_request.factor_ids and not impact_request.rows:
+        raise HTTPException(status_code=400, detail="Give factor_ids, rows or both")
+    dataset = await fetch_dataset()
+    
+    def run() -> JSONResponse:
+        with timed_phase("impact"):
+            result = major_change_impact(
+                dataset.index, dataset.major_changes, impact_request.factor_ids,
+                impact_request.rows, impact_request.emission_unit
+            )
+        record_result_size(len(impact_request.rows))
+        with timed_phase("serialize"):
+            return JSONResponse(content={
+                "year": dataset.year, "source": dataset.major_changes_document["metadata"].get("title"), **result
+            })
+    
+    return await query_executor.run(len(impact_request.factor_ids) + len(impact_request.rows), run)
 
 @app.get("/quick-lookup", summary="Quick lookup for common factors")
 async def quick_lookup(
+    request: Request,
     fuel_type: Optional[str] = Query(None, description="Fuel type (e.g., natural gas, petrol, diesel)"),
     electricity: bool = Query(False, description="UK electricity factors"),
     transport_mode: Optional[str] = Query(None, description="Transport mode (e.g., car, flight, rail)"),
     activity_unit: Optional[str] = Query(None, description="Activity unit")
 ):
-    """Quick lookup for commonly used conversion factors."""
+    """Quick lookup for commonly used conversion factors.
     
-    data = load_conversion_factors()
-    factors = data["conversion_factors"]
+    Lookups added to the quick lookup config are accepted as further query
+    parameters under their configured names.
+    """
     
-    results = []
+    dataset = await fetch_dataset()
+    params: Dict[str, Any] = {}
+    for name, spec in dataset.quick_lookups.specs.items():
+        value = request.query_params.get(name)
+        if spec.get("type") == "flag":
+            params[name] = value is not None and value.lower() in ("1", "true", "yes", "on")
+        else:
+            params[name] = value
     
-    if electricity:
-        # Find UK electricity factors
-        electricity_factors = [
-            f for f in factors 
-            if any(tag in ["electricity", "uk", "grid"] for tag in f.get("tags", []))
-            and f.get("scope") in ["Scope 2", "Scope 1"]
-        ]
-        results.extend(electricity_factors[:10])
-    
-    if fuel_type:
-        # Find fuel factors
-        fuel_factors = [
-            f for f in factors 
-            if any(fuel_type.lower() in tag.lower() for tag in f.get("tags", []))
-            and f.get("category", {}).get("level1") == "Fuels"
-        ]
-        results.extend(fuel_factors[:10])
-    
-    if transport_mode:
-        # Find transport factors
-        transport_factors = [
-            f for f in factors 
-            if any(transport_mode.lower() in tag.lower() for tag in f.get("tags", []))
-            and any(cat in f.get("category", {}).get("level1", "").lower() 
-                   for cat in ["travel", "vehicle", "freight"])
-        ]
-        results.extend(transport_factors[:10])
+    key = cache_key("quick-lookup", dataset, activity_unit=activity_unit, **params)
+    return await cached_json_response(
+        key, lambda: build_quick_lookup(dataset, params), dataset.quick_lookups.cost(params)
+    )
+
+def build_quick_lookup(dataset: FactorDataset, params: Dict[str, Any]) -> bytes:
+    """Merge the precomputed quick lookup tables for /quick-lookup."""
+    with timed_phase("filter"):
+        positions, total = dataset.quick_lookups.lookup(params)
+    record_result_size(total)
+    
+    with timed_phase("serialize"):
+        return b"".join([
+            b'{"results":', join_factors(dataset.encoded_factors[position] for position in positions),
+            b',"total":', dumps(total),
+            b"}"
+        ])
+
+@app.post("/admin/reload", status_code=202, summary="Reload conversion factor data")
+async def reload_datasets(
+    year: Optional[int] = Query(None, description="Year to reload (default: every loaded year)"),
+    x_admin_token: Optional[str] = Header(None)
+):
+    """Rebuild datasets from disk in the background and swap them in when ready.
     
-    # Remove duplicates
-    seen_ids = set()
-    unique_results = []
-    for factor in results:
-        if factor["id"] not in seen_ids:
-            unique_results.append(factor)
-            seen_ids.add(factor["id"])
+    Disabled unless CONVERSION_FACTORS_ADMIN_TOKEN is set; requests must send it as X-Admin-Token.
+    """
     
+    admin_token = os.environ.get("CONVERSION_FACTORS_ADMIN_TOKEN")
+    if not admin_token:
+        raise HTTPException(status_code=404, detail="Admin endpoints are disabled")
+    if not hmac.compare_digest((x_admin_token or "").encode("utf-8"), admin_token.encode("utf-8")):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    
+    years = [require_year(year)] if year is not None else factor_store.loaded_years() or [DEFAULT_YEAR]
+    if not factor_store.reload(years):
+        raise HTTPException(status_code=409, detail="A reload is already in progress")
+    
+    return {
+        "status": "reloading",
+        "years": years,
+        "active_versions": {y: factor_store.get(y).version for y in factor_store.loaded_years()}
+    }
+
+@app.get("/metrics", summary="Prometheus metrics")
+async def metrics():
+    """Request, phase, result size, cache, dataset and process metrics in Prometheus text format."""
+    return Response(content=render_metrics(), media_type="text/plain; version=0.0.4")
+
+@app.get("/cache/stats", summary="Response cache statistics")
+async def get_cache_stats():
+    """Hit and miss counters and current size of the response cache."""
+    return response_cache.stats()
+
+# Health and readiness checks for monitoring
+@app.get("/ready", summary="Readiness probe")
+async def readiness_check():
+    """Ready once startup warm-up has loaded the data; unlike /health, never loads it itself."""
+    years = warm_up_years()
+    if not startup_state["ready"] or not all(factor_store.is_loaded(year) for year in years):
+        detail = startup_state["error"] or "Warming up"
+        raise HTTPException(status_code=503, detail=f"Not ready: {detail}")
     return {
-        "results": [ConversionFactor(**factor) for factor in unique_results[:20]],
-        "total": len(unique_results)
+        "status": "ready",
+        "years": years,
+        "startup_seconds": startup_state["phases"]
     }
 
-# Health check for monitoring
 @app.get("/health", summary="Health check")
 async def health_check():
     """Health check endpoint for monitoring."""
     try:
-        data = load_conversion_factors()
+        dataset = await fetch_dataset()
         return {
             "status": "healthy",
-            "timestamp": "2025-10-19T00:00:00Z",
-            "factors_loaded": data["metadata"]["total_factors"],
-            "version": "1.0.0"
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "uptime_seconds": round(time.monotonic() - PROCESS_STARTED, 3),
+            "factors_loaded": dataset.metadata["total_factors"],
+            "version": "1.0.0",
+            # Same meanings as in each `datasets` entry: reload counter and parser content hash
+            "dataset_reload_version": dataset.version,
+            "dataset_version": dataset.metadata.get("dataset_version"),
+            "dataset_load_seconds": round(dataset.load_seconds, 3),
+            "memory_bytes": {
+                **process_memory_bytes(),
+                # Factor table arrays and strings per loaded year; memory-mapped snapshots count their mapped size
+                "factor_tables": {
+                    str(year): factor_store.get(year).table_bytes for year in factor_store.loaded_years()
+                }
+            },
+            "query_pool": query_executor.stats(),
+            "datasets": [factor_store.get(year).describe() for year in factor_store.loaded_years()]
         }
     except Exception as e:
         raise HTTPException(status_code=503, detail=f"Service unhealthy: {str(e)}")